@@ -11,6 +11,7 @@ from src.models.schemas import (
     AnalyzeBehaviorsResponse,
     CoreBehaviorProfile,
     UpdateBehaviorRequest,
+    BulkUpdateBehaviorsRequest,
     AssignArchetypeRequest,
     AssignArchetypeResponse,
     ListCoreBehaviorsResponse,
@@ -299,6 +300,64 @@ async def update_behavior(request: UpdateBehaviorRequest):
         )
 
 
+@router.post(
+    "/update-behaviors-bulk",
+    response_model=List[BehaviorObservation],
+    status_code=status.HTTP_200_OK,
+    summary="Update metadata of several behaviors",
+    description="Apply /update-behavior style updates to many behaviors in one request"
+)
+async def update_behaviors_bulk(request: BulkUpdateBehaviorsRequest):
+    """
+    Update several behavior documents with one MongoDB bulk write
+    
+    Takes the same allowed updates as /update-behavior, and returns the
+    updated behaviors. Behaviors are stored by observation_id, so each
+    behavior_id in the request is matched against observation_id.
+    """
+    try:
+        # Later entries for the same behavior win, as with sequential updates
+        updates: Dict[str, Dict[str, Any]] = {}
+        for item in request.updates:
+            updates.setdefault(item.behavior_id, {}).update(item.updates)
+        
+        logger.info(f"Bulk updating {len(updates)} behaviors")
+        
+        # Validate all behaviors exist
+        found_ids = {
+            doc["observation_id"]
+            for doc in mongodb_service.get_behaviors_by_ids(list(updates))
+        }
+        missing = [behavior_id for behavior_id in updates if behavior_id not in found_ids]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Behaviors not found: {', '.join(missing)}"
+            )
+        
+        # Update behaviors
+        success = await analysis_pipeline.update_behaviors_metrics_bulk(updates)
+        
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to update behaviors"
+            )
+        
+        # Fetch updated behaviors
+        updated_data = mongodb_service.get_behaviors_by_ids(list(updates))
+        return [BehaviorObservation(**data) for data in updated_data]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk updating behaviors: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk update failed: {str(e)}"
+        )
+
+
 @router.post(
     "/assign-archetype",
     response_model=AssignArchetypeResponse,
@@ -379,35 +438,17 @@ async def analyze_behaviors_cluster_centric(request: AnalyzeBehaviorsRequest):
     """
     try:
         from src.services.cluster_analysis_pipeline import cluster_analysis_pipeline
-        from src.models.schemas import BehaviorObservation, PromptModel
-        import time
         
         logger.info(
             f"[CLUSTER-CENTRIC] Analyzing {len(request.behaviors)} observations "
             f"and {len(request.prompts)} prompts for user {request.user_id}"
         )
         
-        # Convert BehaviorModel to BehaviorObservation
-        observations = []
-        for b in request.behaviors:
-            obs = BehaviorObservation(
-                observation_id=b.behavior_id,
-                behavior_text=b.behavior_text,
-                credibility=b.credibility,
-                clarity_score=b.clarity_score,
-                extraction_confidence=b.extraction_confidence,
-                timestamp=b.created_at,
-                prompt_id=b.prompt_history_ids[0] if b.prompt_history_ids else 'unknown',
-                decay_rate=b.decay_rate,
-                user_id=b.user_id,
-                session_id=b.session_id
-            )
-            observations.append(obs)
-        
-        # Run cluster-centric analysis
+        # Run cluster-centric analysis. BehaviorModel is BehaviorObservation and
+        # FastAPI has already validated the request, so no conversion is needed
         profile = await cluster_analysis_pipeline.analyze_observations(
             user_id=request.user_id,
-            observations=observations,
+            observations=request.behaviors,
             prompts=request.prompts,
             generate_archetype=True,
             store_in_dbs=False  # Don't store yet - this is for testing
@@ -13,6 +13,9 @@ class Settings(BaseSettings):
     mongodb_database: str
     qdrant_url: str
     qdrant_collection: str
+    qdrant_prefer_grpc: bool = False  # opt in to protobuf transport on qdrant_grpc_port
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout: int = 30
     
     # OpenAI Configuration
     openai_api_key: str
@@ -1,6 +1,7 @@
 """MongoDB database service for CBIE system"""
-from typing import List, Optional, Dict, Any
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from typing import List, Optional, Dict, Any, Iterable
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne
+from pymongo.write_concern import WriteConcern
 from pymongo.errors import PyMongoError
 import logging
 
@@ -23,7 +24,10 @@ class MongoDBService:
         self.db = None
         
     def connect(self):
-        """Establish MongoDB connection"""
+        """Establish MongoDB connection (no-op if already connected)"""
+        if self.client is not None:
+            return
+        
         try:
             self.client = MongoClient(settings.mongodb_url)
             self.db = self.client[settings.mongodb_database]
@@ -34,12 +38,15 @@ class MongoDBService:
             logger.info(f"Connected to MongoDB: {settings.mongodb_database}")
         except PyMongoError as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
+            self.disconnect()
             raise
     
     def disconnect(self):
-        """Close MongoDB connection"""
+        """Close MongoDB connection; a later connect() opens a new one"""
         if self.client:
             self.client.close()
+            self.client = None
+            self.db = None
             logger.info("Disconnected from MongoDB")
     
     def _create_indexes(self):
@@ -78,16 +85,40 @@ class MongoDBService:
             logger.error(f"Error inserting behavior: {e}")
             return False
     
-    def insert_behaviors_bulk(self, behaviors: List[BehaviorModel]) -> bool:
-        """Insert multiple behaviors"""
+    def _insert_many(self, collection_name: str, docs: Iterable[Dict[str, Any]], fast: bool):
+        """insert_many into a collection, optionally unordered with w=0
+        
+        pymongo rejects bypass_document_validation on unacknowledged writes,
+        so the fast path leaves it unset.
+        """
+        if fast:
+            collection = self.db.get_collection(collection_name, write_concern=WriteConcern(w=0))
+            collection.insert_many(docs, ordered=False)
+        else:
+            self.db[collection_name].insert_many(docs)
+    
+    def insert_behaviors_bulk(self, behaviors: Iterable[BehaviorModel], fast: bool = False) -> bool:
+        """Insert multiple behaviors (any iterable; consumed lazily by the driver)"""
         try:
-            docs = [b.model_dump() for b in behaviors]
-            self.db.behaviors.insert_many(docs)
+            docs = (b.model_dump() for b in behaviors)
+            self._insert_many("behaviors", docs, fast)
             return True
         except PyMongoError as e:
             logger.error(f"Error bulk inserting behaviors: {e}")
             return False
     
+    def insert_behavior_documents(self, docs: Iterable[Dict[str, Any]], fast: bool = False) -> bool:
+        """Insert behavior documents that are already shaped like model_dump() output
+        
+        fast=True behaves as in insert_prompts_bulk (unordered, unacknowledged).
+        """
+        try:
+            self._insert_many("behaviors", docs, fast)
+            return True
+        except PyMongoError as e:
+            logger.error(f"Error bulk inserting behavior documents: {e}")
+            return False
+    
     def get_behavior(self, behavior_id: str) -> Optional[Dict]:
         """Get a behavior by ID"""
         try:
@@ -116,6 +147,36 @@ class MongoDBService:
             logger.error(f"Error updating behavior: {e}")
             return False
     
+    def get_behaviors_by_ids(self, observation_ids: List[str]) -> List[Dict]:
+        """Get behaviors by a list of observation IDs"""
+        try:
+            return list(self.db.behaviors.find({"observation_id": {"$in": observation_ids}}))
+        except PyMongoError as e:
+            logger.error(f"Error fetching behaviors: {e}")
+            return []
+    
+    def update_behaviors_bulk(self, updates: Dict[str, Dict[str, Any]]) -> bool:
+        """Update several behavior documents in one unordered bulk_write
+        
+        Args:
+            updates: Maps observation_id to the fields to $set on it
+        """
+        if not updates:
+            return True
+        
+        try:
+            self.db.behaviors.bulk_write(
+                [
+                    UpdateOne({"observation_id": observation_id}, {"$set": fields})
+                    for observation_id, fields in updates.items()
+                ],
+                ordered=False
+            )
+            return True
+        except PyMongoError as e:
+            logger.error(f"Error bulk updating behaviors: {e}")
+            return False
+    
     def delete_behavior(self, behavior_id: str) -> bool:
         """Delete a behavior document"""
         try:
@@ -136,11 +197,16 @@ class MongoDBService:
             logger.error(f"Error inserting prompt: {e}")
             return False
     
-    def insert_prompts_bulk(self, prompts: List[PromptModel]) -> bool:
-        """Insert multiple prompts"""
+    def insert_prompts_bulk(self, prompts: List[PromptModel], fast: bool = False) -> bool:
+        """Insert multiple prompts
+        
+        With fast=True the insert is unordered and unacknowledged (w=0), so
+        write errors such as duplicate ids are not reported. Only use it for
+        re-runnable fixture loads.
+        """
         try:
             docs = [p.model_dump() for p in prompts]
-            self.db.prompts.insert_many(docs)
+            self._insert_many("prompts", docs, fast)
             return True
         except PyMongoError as e:
             logger.error(f"Error bulk inserting prompts: {e}")
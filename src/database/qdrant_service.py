@@ -1,5 +1,6 @@
 """Qdrant vector database service for CBIE system"""
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance, 
@@ -29,7 +30,12 @@ class QdrantService:
     def connect(self):
         """Establish Qdrant connection and ensure collection exists"""
         try:
-            self.client = QdrantClient(url=settings.qdrant_url)
+            self.client = QdrantClient(
+                url=settings.qdrant_url,
+                prefer_grpc=settings.qdrant_prefer_grpc,
+                grpc_port=settings.qdrant_grpc_port,
+                timeout=settings.qdrant_timeout
+            )
             
             # Create collection if it doesn't exist
             self._ensure_collection()
@@ -121,15 +127,19 @@ class QdrantService:
     
     def insert_behaviors_with_embeddings(
         self, 
-        embeddings: List[List[float]], 
-        behaviors: List[Dict[str, Any]]
+        embeddings: Union[np.ndarray, List[List[float]]], 
+        behaviors: List[Dict[str, Any]],
+        wait: bool = True,
+        batch_size: int = 256
     ) -> bool:
         """
         Insert complete behavior data with embeddings into Qdrant
         
         Args:
-            embeddings: List of embedding vectors
+            embeddings: (N, D) float32 array or list of embedding vectors
             behaviors: List of complete behavior dictionaries with all metadata
+            wait: Wait for each batch to be indexed before sending the next
+            batch_size: Number of points per upsert request
             
         Returns:
             bool: Success status
@@ -138,8 +148,8 @@ class QdrantService:
             if len(embeddings) != len(behaviors):
                 raise ValueError("Embeddings and behaviors lists must have the same length")
             
-            points = []
-            for i, (embedding, behavior) in enumerate(zip(embeddings, behaviors)):
+            payloads = []
+            for behavior in behaviors:
                 # Create payload with all behavior metadata
                 payload = {
                     "behavior_id": behavior.get("behavior_id"),
@@ -163,19 +173,37 @@ class QdrantService:
                 if "expertise_level" in behavior:
                     payload["expertise_level"] = behavior["expertise_level"]
                 
-                point = PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=embedding,
-                    payload=payload
-                )
-                points.append(point)
+                payloads.append(payload)
             
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+            ids = [str(uuid.uuid4()) for _ in payloads]
+            
+            if isinstance(embeddings, np.ndarray):
+                # upload_collection takes the array as is and converts one
+                # batch at a time, instead of materializing N*D Python floats
+                self.client.upload_collection(
+                    collection_name=self.collection_name,
+                    vectors=embeddings,
+                    payload=payloads,
+                    ids=ids,
+                    batch_size=batch_size,
+                    wait=wait
+                )
+            else:
+                points = [
+                    PointStruct(id=point_id, vector=embedding, payload=payload)
+                    for point_id, embedding, payload in zip(ids, embeddings, payloads)
+                ]
+                
+                # Upsert in batches; with wait=False the next batch is serialized
+                # while the server is still indexing the previous one
+                for start in range(0, len(points), batch_size):
+                    self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=points[start:start + batch_size],
+                        wait=wait
+                    )
             
-            logger.info(f"Inserted {len(points)} complete behaviors with embeddings")
+            logger.info(f"Inserted {len(payloads)} complete behaviors with embeddings")
             return True
             
         except Exception as e:
@@ -255,6 +255,14 @@ class UpdateBehaviorRequest(BaseModel):
     updates: Dict[str, Any]
 
 
+class BulkUpdateBehaviorsRequest(BaseModel):
+    """Request body for /update-behaviors-bulk endpoint
+    
+    Each behavior_id is the observation_id of a stored behavior.
+    """
+    updates: List[UpdateBehaviorRequest] = Field(min_length=1)
+
+
 class AssignArchetypeRequest(BaseModel):
     """Request body for /assign-archetype endpoint"""
     user_id: str
@@ -506,6 +506,31 @@ class AnalysisPipeline:
             logger.error(f"Error updating behavior: {e}")
             return False
     
+    async def update_behaviors_metrics_bulk(
+        self,
+        updates: Dict[str, Dict[str, Any]]
+    ) -> bool:
+        """
+        Update several behaviors in a single MongoDB bulk write
+        
+        Args:
+            updates: Maps behavior identifier to the fields to update
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            success = self.mongodb.update_behaviors_bulk(updates)
+            
+            if success:
+                logger.info(f"Updated {len(updates)} behaviors in bulk")
+            
+            return success
+            
+        except Exception as e:
+            logger.error(f"Error bulk updating behaviors: {e}")
+            return False
+    
     async def assign_archetype_to_profile(
         self,
         user_id: str,
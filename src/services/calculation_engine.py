@@ -14,6 +14,7 @@ ACTIVE METHODS (used in cluster-centric pipeline):
 DEPRECATED METHODS (not used, kept for reference):
   ❌ calculate_behavior_weight() - Old BW formula
   ❌ calculate_adjusted_behavior_weight() - Old ABW formula
+  ❌ calculate_*_weights_batch() - NumPy versions of BW/ABW
   ❌ calculate_cluster_cbi() - Old CBI formula
   ❌ select_canonical_behavior() - Old selection method
   ❌ assign_tier() - Old tier assignment
@@ -118,6 +119,46 @@ class CalculationEngine:
         
         return abw
     
+    def calculate_behavior_weights_batch(
+        self,
+        credibility: np.ndarray,
+        clarity_score: np.ndarray,
+        extraction_confidence: np.ndarray
+    ) -> np.ndarray:
+        """
+        ⚠️ DEPRECATED - NOT USED IN CLUSTER-CENTRIC PIPELINE ⚠️
+        
+        Vectorized calculate_behavior_weight() over equal-length arrays
+        
+        Returns:
+            np.ndarray: Behavior Weight per row
+        """
+        return (
+            np.power(np.asarray(credibility, dtype=np.float64), self.alpha) *
+            np.power(np.asarray(clarity_score, dtype=np.float64), self.beta) *
+            np.power(np.asarray(extraction_confidence, dtype=np.float64), self.gamma)
+        )
+    
+    def calculate_adjusted_behavior_weights_batch(
+        self,
+        behavior_weight: np.ndarray,
+        reinforcement_count: np.ndarray,
+        decay_rate: np.ndarray,
+        days_since_last_seen: np.ndarray
+    ) -> np.ndarray:
+        """
+        ⚠️ DEPRECATED - NOT USED IN CLUSTER-CENTRIC PIPELINE ⚠️
+        
+        Vectorized calculate_adjusted_behavior_weight() over equal-length arrays
+        
+        Returns:
+            np.ndarray: Adjusted Behavior Weight per row
+        """
+        reinforcement_factor = 1 + np.asarray(reinforcement_count, dtype=np.float64) * self.reinforcement_multiplier
+        decay_factor = np.exp(-np.asarray(decay_rate, dtype=np.float64) * np.asarray(days_since_last_seen, dtype=np.float64))
+        
+        return np.asarray(behavior_weight, dtype=np.float64) * reinforcement_factor * decay_factor
+    
     def calculate_days_since_last_seen(
         self,
         last_seen_timestamp: int,
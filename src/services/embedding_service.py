@@ -4,6 +4,7 @@ Interfaces with Azure OpenAI for generating behavior embeddings
 """
 from typing import List, Optional
 import logging
+import numpy as np
 from openai import AzureOpenAI
 
 from src.config import settings
@@ -56,7 +57,7 @@ class EmbeddingService:
             logger.error(f"Error generating embedding: {e}")
             raise
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts in batch
         
@@ -64,11 +65,11 @@ class EmbeddingService:
             texts: List of input texts to embed
             
         Returns:
-            List[List[float]]: List of embedding vectors
+            np.ndarray: float32 array of shape (len(texts), dimensions)
         """
         try:
             if not texts:
-                return []
+                return np.empty((0, 0), dtype=np.float32)
             
             # Azure OpenAI supports batch embedding
             response = self.client.embeddings.create(
@@ -76,8 +77,11 @@ class EmbeddingService:
                 model=self.model
             )
             
-            # Extract embeddings in order
-            embeddings = [item.embedding for item in response.data]
+            # Extract embeddings in order into one contiguous float32 block
+            embeddings = np.asarray(
+                [item.embedding for item in response.data],
+                dtype=np.float32
+            )
             
             logger.info(f"Generated {len(embeddings)} embeddings in batch")
             
@@ -108,7 +112,7 @@ class EmbeddingService:
         for i in range(0, len(behavior_texts), batch_size):
             batch = behavior_texts[i:i + batch_size]
             batch_embeddings = self.generate_embeddings_batch(batch)
-            all_embeddings.extend(batch_embeddings)
+            all_embeddings.extend(batch_embeddings.tolist())
             
             logger.info(
                 f"Processed batch {i // batch_size + 1}: "
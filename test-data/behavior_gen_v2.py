@@ -1,18 +1,44 @@
 import json
-import random
+import os
 import time
-import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from itertools import repeat
+from operator import attrgetter, itemgetter
 from typing import List, Dict, Tuple
 
+import numpy as np
+
 # ------------------ CONFIG ------------------
 
 OUTPUT_DIR = "./behavior_dataset/"
 
+# Single PCG64 generator for all draws; set CBAC_SEED for reproducible datasets
+SEED = os.environ.get("CBAC_SEED")
+RNG = np.random.default_rng(int(SEED) if SEED else None)
+
+# Datasets at least this large are generated across all cores
+PARALLEL_MIN_PROMPTS = 50_000
+
+# ------------------ Records ------------------
+
+@dataclass
+class Prompt:
+    """Generated prompt record (serialized to a dict only on export)"""
+    # Declared by hand rather than dataclass(slots=True), which needs 3.10
+    __slots__ = ("prompt_id", "prompt_text", "timestamp", "tokens", "user_id", "session_id")
+    
+    prompt_id: str
+    prompt_text: str
+    timestamp: int
+    tokens: float
+    user_id: str
+    session_id: str
+
 # ------------------ Utilities ------------------
 
-def generate_id(prefix: str) -> str:
-    seed = f"{random.random()}{time.time()}"
-    return f"{prefix}_{hashlib.md5(seed.encode()).hexdigest()[:8]}"
+def generate_id(prefix: str, rng: np.random.Generator = RNG) -> str:
+    return f"{prefix}_{rng.bytes(4).hex()}"
 
 def estimate_tokens(text: str) -> float:
     return round(len(text) / 4, 1)
@@ -191,47 +217,105 @@ def calculate_target_profile(num_behaviors: int, profile_type: str = "balanced")
         "noise": num_noise
     }
 
-def calculate_reinforcement_target(tier: str, num_prompts: int) -> int:
-    """Calculate target reinforcement count based on tier"""
-    if tier == "primary":
-        # PRIMARY needs high reinforcement: 15-30% of prompts
-        min_count = max(3, int(num_prompts * 0.15))
-        max_count = max(min_count + 1, min(50, int(num_prompts * 0.30)))
-        return random.randint(min_count, max_count)
-    elif tier == "secondary":
-        # SECONDARY moderate reinforcement: 8-15% of prompts
-        min_count = max(2, int(num_prompts * 0.08))
-        max_count = max(min_count + 1, min(20, int(num_prompts * 0.15)))
-        return random.randint(min_count, max_count)
-    else:  # noise
-        # NOISE low reinforcement: 2-7% of prompts
-        min_count = max(1, int(num_prompts * 0.02))
-        max_count = max(min_count + 1, min(8, int(num_prompts * 0.07)))
-        return random.randint(min_count, max_count)
-
-def generate_behavior_metadata(tier: str) -> Dict:
-    """Generate behavior metadata appropriate for tier"""
-    if tier == "primary":
-        return {
-            "credibility": round(random.uniform(0.88, 0.95), 2),
-            "clarity_score": round(random.uniform(0.80, 0.95), 2),
-            "extraction_confidence": round(random.uniform(0.75, 0.95), 2),
-            "decay_rate": round(random.uniform(0.01, 0.015), 3)  # Low decay
-        }
-    elif tier == "secondary":
-        return {
-            "credibility": round(random.uniform(0.70, 0.88), 2),
-            "clarity_score": round(random.uniform(0.70, 0.85), 2),
-            "extraction_confidence": round(random.uniform(0.65, 0.85), 2),
-            "decay_rate": round(random.uniform(0.015, 0.022), 3)  # Medium decay
-        }
-    else:  # noise
-        return {
-            "credibility": round(random.uniform(0.45, 0.70), 2),
-            "clarity_score": round(random.uniform(0.55, 0.75), 2),
-            "extraction_confidence": round(random.uniform(0.50, 0.75), 2),
-            "decay_rate": round(random.uniform(0.020, 0.030), 3)  # High decay
-        }
+# Tier order used to index the per-tier metadata ranges below
+TIER_INDEX = {"primary": 0, "secondary": 1, "noise": 2}
+
+# field -> (low per tier, high per tier)
+METADATA_RANGES = {
+    "credibility": ([0.88, 0.70, 0.45], [0.95, 0.88, 0.70]),
+    "clarity_score": ([0.80, 0.70, 0.55], [0.95, 0.85, 0.75]),
+    "extraction_confidence": ([0.75, 0.65, 0.50], [0.95, 0.85, 0.75]),
+    "decay_rate": ([0.01, 0.015, 0.020], [0.015, 0.022, 0.030])  # Low/medium/high decay
+}
+
+# Reinforcement targets as shares of num_prompts, per tier:
+# PRIMARY 15-30% (cap 50), SECONDARY 8-15% (cap 20), NOISE 2-7% (cap 8)
+REINFORCEMENT_RANGES = {
+    "min_floor": [3, 2, 1],
+    "min_share": [0.15, 0.08, 0.02],
+    "max_cap": [50, 20, 8],
+    "max_share": [0.30, 0.15, 0.07]
+}
+
+def calculate_reinforcement_targets(tiers: List[str], num_prompts: int) -> List[int]:
+    """Calculate target reinforcement counts for all tiers in one vectorized draw"""
+    tier_idx = np.array([TIER_INDEX.get(tier, TIER_INDEX["noise"]) for tier in tiers], dtype=np.intp)
+    ranges = {key: np.asarray(values)[tier_idx] for key, values in REINFORCEMENT_RANGES.items()}
+    
+    low = np.maximum(ranges["min_floor"], (num_prompts * ranges["min_share"]).astype(int))
+    high = np.maximum(low + 1, np.minimum(ranges["max_cap"], (num_prompts * ranges["max_share"]).astype(int)))
+    return RNG.integers(low, high + 1).tolist()
+
+def generate_behavior_metadata(tiers: List[str]) -> List[Dict]:
+    """Generate behavior metadata appropriate for each tier in one vectorized draw"""
+    tier_idx = np.array([TIER_INDEX.get(tier, TIER_INDEX["noise"]) for tier in tiers], dtype=np.intp)
+    
+    columns = {}
+    for field, (low, high) in METADATA_RANGES.items():
+        columns[field] = RNG.uniform(np.asarray(low)[tier_idx], np.asarray(high)[tier_idx]).tolist()
+    
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+def _generate_prompt_chunk(
+    schedule: np.ndarray,
+    behavior_names: Tuple[str, ...],
+    base_time: int,
+    user_id: str,
+    session_id: str,
+    seed: int
+) -> Tuple[List[Prompt], List[List[str]], List[int]]:
+    """
+    Generate prompts for one slice of the schedule
+    
+    Returns the prompts plus, per behavior index, the prompt ids it gained
+    and its latest timestamp. Each chunk draws from its own seeded generator.
+    """
+    rng = np.random.default_rng(seed)
+    size = len(schedule)
+    
+    prompts = []
+    history = [[] for _ in behavior_names]
+    last_seen = [base_time] * len(behavior_names)
+    
+    # Draw all per-prompt randomness up front
+    picks = rng.random(size).tolist()
+    clustered = (rng.random(size) < 0.3).tolist()
+    gaps = rng.integers(60, 3600, size, endpoint=True).tolist()
+    offsets = rng.integers(0, 86400 * 60, size, endpoint=True).tolist()
+    
+    # Bind hot-loop globals as locals
+    _lib = BEHAVIOR_LIBRARY
+    _gen_id = generate_id
+    _estimate_tokens = estimate_tokens
+    append_prompt = prompts.append
+    
+    timestamp = base_time
+    for i, behavior_idx in enumerate(schedule.tolist()):
+        behavior_text = behavior_names[behavior_idx]
+        templates = _lib[behavior_text]
+        prompt_text = templates[int(picks[i] * len(templates))]
+        prompt_id = _gen_id("prompt", rng)
+        
+        # Add time variance with temporal clustering
+        if i > 0 and clustered[i]:
+            timestamp = timestamp + gaps[i]
+        else:
+            timestamp = base_time + offsets[i]
+
+        append_prompt(Prompt(
+            prompt_id,
+            prompt_text,
+            timestamp,
+            _estimate_tokens(prompt_text),
+            user_id,
+            session_id
+        ))
+
+        history[behavior_idx].append(prompt_id)
+        if timestamp > last_seen[behavior_idx]:
+            last_seen[behavior_idx] = timestamp
+    
+    return prompts, history, last_seen
 
 def generate_dataset(
     num_prompts: int,
@@ -239,7 +323,7 @@ def generate_dataset(
     session_id: str,
     profile_type: str = "balanced",
     num_behaviors: int = None
-) -> Tuple[List[Dict], List[Dict]]:
+) -> Tuple[List[Prompt], List[Dict]]:
     """
     Generate realistic dataset with configurable behavior profiles
     
@@ -258,7 +342,7 @@ def generate_dataset(
     available_behaviors = list(BEHAVIOR_LIBRARY.keys())
     if num_behaviors:
         num_behaviors = min(num_behaviors, len(available_behaviors))
-        available_behaviors = random.sample(available_behaviors, num_behaviors)
+        available_behaviors = RNG.choice(available_behaviors, num_behaviors, replace=False).tolist()
     else:
         num_behaviors = len(available_behaviors)
     
@@ -270,7 +354,7 @@ def generate_dataset(
     print(f"  NOISE: {distribution['noise']} behaviors")
     
     # Assign tiers to behaviors
-    random.shuffle(available_behaviors)
+    RNG.shuffle(available_behaviors)
     behavior_tiers = {}
     idx = 0
     
@@ -281,76 +365,88 @@ def generate_dataset(
                 behavior_tiers[available_behaviors[idx]] = tier
                 idx += 1
     
+    # Draw metadata for all behaviors at once
+    behavior_metadata = dict(zip(
+        behavior_tiers,
+        generate_behavior_metadata(list(behavior_tiers.values()))
+    ))
+    
     # Calculate reinforcement targets
-    behavior_targets = {}
-    for behavior_text, tier in behavior_tiers.items():
-        behavior_targets[behavior_text] = calculate_reinforcement_target(tier, num_prompts)
+    behavior_targets = dict(zip(
+        behavior_tiers,
+        calculate_reinforcement_targets(list(behavior_tiers.values()), num_prompts)
+    ))
     
-    # Build prompt schedule
-    prompt_schedule = []
-    for behavior_text, target_count in behavior_targets.items():
-        prompt_schedule.extend([behavior_text] * target_count)
+    # Build prompt schedule as an array of behavior indices
+    behavior_names = tuple(behavior_targets)
+    behavior_indices = np.arange(len(behavior_names))
+    prompt_schedule = np.repeat(behavior_indices, list(behavior_targets.values()))
     
     # Fill remaining prompts with random behaviors
     remaining = num_prompts - len(prompt_schedule)
     if remaining > 0:
-        prompt_schedule.extend(
-            random.choices(list(behavior_tiers.keys()), k=remaining)
+        prompt_schedule = np.concatenate(
+            (prompt_schedule, RNG.choice(behavior_indices, remaining))
         )
     
     # Shuffle to randomize order
-    random.shuffle(prompt_schedule)
+    RNG.shuffle(prompt_schedule)
     prompt_schedule = prompt_schedule[:num_prompts]  # Trim to exact count
     
-    # Generate prompts
-    for i, behavior_text in enumerate(prompt_schedule):
-        prompt_text = random.choice(BEHAVIOR_LIBRARY[behavior_text])
-        prompt_id = generate_id("prompt")
-        
-        # Add time variance with temporal clustering
-        if i > 0 and random.random() < 0.3:
-            timestamp = prompts[-1]["timestamp"] + random.randint(60, 3600)
-        else:
-            timestamp = base_time + random.randint(0, 86400 * 60)
-
-        prompt = {
-            "prompt_id": prompt_id,
-            "prompt_text": prompt_text,
-            "timestamp": timestamp,
-            "tokens": estimate_tokens(prompt_text),
+    # Create all behavior objects up front; the loop only updates them
+    for behavior_text in behavior_names:
+        metadata = behavior_metadata[behavior_text]
+        behaviors[behavior_text] = {
+            "behavior_id": generate_id("beh"),
+            "behavior_text": behavior_text,
+            "credibility": metadata["credibility"],
+            "reinforcement_count": 0,
+            "decay_rate": metadata["decay_rate"],
+            "created_at": base_time,
+            "last_seen": base_time,
+            "prompt_history_ids": [],
+            "clarity_score": metadata["clarity_score"],
+            "extraction_confidence": metadata["extraction_confidence"],
             "user_id": user_id,
-            "session_id": session_id
+            "session_id": session_id,
+            "_tier": behavior_tiers[behavior_text]  # Internal marker for verification
         }
+    behavior_records = tuple(behaviors.values())
+    
+    # Generate prompts, fanning out across cores for large datasets
+    if num_prompts >= PARALLEL_MIN_PROMPTS and (os.cpu_count() or 1) > 1:
+        workers = os.cpu_count()
+        chunks = np.array_split(prompt_schedule, workers)
+        seeds = RNG.integers(2**63, size=workers).tolist()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                _generate_prompt_chunk,
+                chunks,
+                repeat(behavior_names),
+                repeat(base_time),
+                repeat(user_id),
+                repeat(session_id),
+                seeds
+            ))
+    else:
+        results = [_generate_prompt_chunk(
+            prompt_schedule, behavior_names, base_time, user_id, session_id,
+            int(RNG.integers(2**63))
+        )]
+    
+    # Merge chunk results into the shared behavior objects
+    for chunk_prompts, chunk_history, chunk_last_seen in results:
+        prompts.extend(chunk_prompts)
+        for behavior, history, last_seen in zip(behavior_records, chunk_history, chunk_last_seen):
+            if history:
+                behavior["prompt_history_ids"].extend(history)
+                behavior["reinforcement_count"] += len(history)
+                behavior["last_seen"] = max(behavior["last_seen"], last_seen)
 
-        # Initialize behavior if first occurrence
-        if behavior_text not in behaviors:
-            tier = behavior_tiers.get(behavior_text, "noise")
-            metadata = generate_behavior_metadata(tier)
-            
-            behaviors[behavior_text] = {
-                "behavior_id": generate_id("beh"),
-                "behavior_text": behavior_text,
-                "credibility": metadata["credibility"],
-                "reinforcement_count": 0,
-                "decay_rate": metadata["decay_rate"],
-                "created_at": timestamp,
-                "last_seen": timestamp,
-                "prompt_history_ids": [],
-                "clarity_score": metadata["clarity_score"],
-                "extraction_confidence": metadata["extraction_confidence"],
-                "user_id": user_id,
-                "session_id": session_id,
-                "_tier": tier  # Internal marker for verification
-            }
-
-        behavior = behaviors[behavior_text]
-        behavior["prompt_history_ids"].append(prompt_id)
-        behavior["reinforcement_count"] += 1
-        behavior["last_seen"] = max(behavior["last_seen"], timestamp)
-        
-        prompts.append(prompt)
-
-    return sorted(prompts, key=lambda x: x["timestamp"]), list(behaviors.values())
+    # Drop behaviors whose scheduled prompts were all trimmed away
+    observed = [b for b in behaviors.values() if b["reinforcement_count"]]
+    
+    return sorted(prompts, key=attrgetter("timestamp")), observed
 
 def clean_behaviors_for_export(behaviors: List[Dict]) -> List[Dict]:
     """Remove internal fields before export"""
@@ -362,13 +458,12 @@ def clean_behaviors_for_export(behaviors: List[Dict]) -> List[Dict]:
 
 # ------------------ Save to Local Directory ------------------
 
-def save_to_local(data: List[Dict], filename: str):
-    import os
+def save_to_local(data: List, filename: str):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     full_path = os.path.join(OUTPUT_DIR, filename)
     with open(full_path, "w") as f:
-        json.dump(data, f, indent=2)
+        json.dump(data, f, indent=2, default=asdict)
 
     print(f"✓ Saved {len(data)} records → {full_path}")
 
@@ -379,21 +474,22 @@ def calculate_expected_scores(behaviors: List[Dict], include_tiers: bool = True)
     alpha, beta, gamma = 0.35, 0.40, 0.25
     reinforcement_multiplier = 0.01
     current_time = int(time.time())
+    _exp = math.exp
     
     scored_behaviors = []
     
     for b in behaviors:
         # Calculate BW
         bw = (
-            math.pow(b["credibility"], alpha) *
-            math.pow(b["clarity_score"], beta) *
-            math.pow(b["extraction_confidence"], gamma)
+            b["credibility"] ** alpha *
+            b["clarity_score"] ** beta *
+            b["extraction_confidence"] ** gamma
         )
         
         # Calculate ABW
         days_since = (current_time - b["last_seen"]) / 86400
         reinforcement_factor = 1 + (b["reinforcement_count"] * reinforcement_multiplier)
-        decay_factor = math.exp(-b["decay_rate"] * days_since)
+        decay_factor = _exp(-b["decay_rate"] * days_since)
         abw = bw * reinforcement_factor * decay_factor
         
         # Determine actual tier based on ABW
@@ -409,14 +505,14 @@ def calculate_expected_scores(behaviors: List[Dict], include_tiers: bool = True)
             "actual_tier": actual_tier,
             "reinforcement_count": b["reinforcement_count"],
             "credibility": b["credibility"],
-            "bw": round(bw, 4),
-            "abw": round(abw, 4)
+            "bw": bw,
+            "abw": abw
         })
     
     return scored_behaviors
 
-def print_statistics(prompts: List[Dict], behaviors: List[Dict], show_targets: bool = True):
-    """Print dataset statistics with tier predictions"""
+def print_statistics(prompts: List[Prompt], behaviors: List[Dict], show_targets: bool = True, verbose: bool = True):
+    """Print dataset statistics with tier predictions (verbose=False prints totals only)"""
     print("\n" + "="*50)
     print("DATASET STATISTICS")
     print("="*50)
@@ -456,26 +552,27 @@ def print_statistics(prompts: List[Dict], behaviors: List[Dict], show_targets: b
         matches = sum(1 for s in scored if s.get("target_tier") == s["actual_tier"])
         print(f"\n✓ Target/Actual Match: {matches}/{len(scored)} ({matches*100//len(scored)}%)")
     
-    # Detailed behavior breakdown
-    print(f"\n📋 Behavior Details (sorted by ABW):")
-    for s in sorted(scored, key=lambda x: x["abw"], reverse=True):
-        actual_icon = {"primary": "🟢", "secondary": "🟡", "noise": "🔴"}.get(s["actual_tier"], "⚪")
-        
-        if show_targets:
-            target_icon = {"primary": "🟢", "secondary": "🟡", "noise": "🔴"}.get(s.get("target_tier"), "⚪")
-            tier_str = f"{target_icon}→{actual_icon}"
-        else:
-            tier_str = f"{actual_icon}"
-        
-        print(f"  {tier_str} {s['behavior_text'][:38]:38} | "
-              f"Count: {s['reinforcement_count']:3} | "
-              f"Cred: {s['credibility']:.2f} | "
-              f"BW: {s['bw']:.4f} | "
-              f"ABW: {s['abw']:.4f}")
+    # Detailed behavior breakdown (skipped in batch mode)
+    if verbose:
+        print(f"\n📋 Behavior Details (sorted by ABW):")
+        for s in sorted(scored, key=itemgetter("abw"), reverse=True):
+            actual_icon = {"primary": "🟢", "secondary": "🟡", "noise": "🔴"}.get(s["actual_tier"], "⚪")
+            
+            if show_targets:
+                target_icon = {"primary": "🟢", "secondary": "🟡", "noise": "🔴"}.get(s.get("target_tier"), "⚪")
+                tier_str = f"{target_icon}→{actual_icon}"
+            else:
+                tier_str = f"{actual_icon}"
+            
+            print(f"  {tier_str} {s['behavior_text'][:38]:38} | "
+                  f"Count: {s['reinforcement_count']:3} | "
+                  f"Cred: {s['credibility']:.2f} | "
+                  f"BW: {s['bw']:.4f} | "
+                  f"ABW: {s['abw']:.4f}")
     
     # Time span
     if prompts:
-        time_span_days = (prompts[-1]["timestamp"] - prompts[0]["timestamp"]) / 86400
+        time_span_days = (prompts[-1].timestamp - prompts[0].timestamp) / 86400
         print(f"\n⏱️  Time Span: {time_span_days:.1f} days")
     
     # Score thresholds reminder
@@ -490,8 +587,8 @@ def print_statistics(prompts: List[Dict], behaviors: List[Dict], show_targets: b
 # ------------------ Main ------------------
 
 if __name__ == "__main__":
-    USER_ID = f"user_{random.randint(100,999)}"
-    SESSION_ID = f"session_{random.randint(1000,9999)}"
+    USER_ID = f"user_{RNG.integers(100, 999, endpoint=True)}"
+    SESSION_ID = f"session_{RNG.integers(1000, 9999, endpoint=True)}"
 
     print("\n" + "="*60)
     print("CBIE DATASET GENERATOR v2.0")
@@ -540,7 +637,7 @@ if __name__ == "__main__":
     save_to_local(prompts, f"prompts_{USER_ID}_{timestamp}.json")
     
     # Print statistics BEFORE cleaning (to show _tier info)
-    print_statistics(prompts, behaviors, show_targets=True)
+    print_statistics(prompts, behaviors, show_targets=True, verbose=os.environ.get("CBAC_QUIET") != "1")
     
     # Clean behaviors before saving (removes internal _tier field)
     behaviors_clean = clean_behaviors_for_export(behaviors)
@@ -549,6 +646,6 @@ if __name__ == "__main__":
     print("\n💡 Tip: Run 'python load_data_to_databases.py' to import into MongoDB/Qdrant")
     
     print("\n📄 Sample prompt:")
-    print(json.dumps(prompts[0], indent=2))
+    print(json.dumps(asdict(prompts[0]), indent=2))
     print("\n🎯 Sample behavior:")
     print(json.dumps(behaviors_clean[0], indent=2))
\ No newline at end of file
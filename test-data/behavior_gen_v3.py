@@ -1,21 +1,20 @@
 import json
-import random
+import os
 import time
-import hashlib
-from typing import List, Dict, Tuple
+from itertools import repeat
+from typing import List, Dict, Tuple, Iterable, Optional
 
-# ------------------ CONFIG ------------------
+import numpy as np
 
-OUTPUT_DIR = "./behavior_dataset/"
+from dataset_io import ensure_output_dir, save_records
+from dataset_kernels import accumulate_behaviors, estimate_tokens, generate_ids
 
-# ------------------ Utilities ------------------
+# ------------------ CONFIG ------------------
 
-def generate_id(prefix: str) -> str:
-    seed = f"{random.random()}{time.time()}"
-    return f"{prefix}_{hashlib.md5(seed.encode()).hexdigest()[:8]}"
+OUTPUT_DIR = "./behavior_dataset/"
 
-def estimate_tokens(text: str) -> float:
-    return round(len(text) / 4, 1)
+# Field order of exported prompt records
+PROMPT_KEYS = ("prompt_id", "prompt_text", "timestamp", "tokens", "user_id", "session_id")
 
 # ------------------ Expanded Behavior Library ------------------
 
@@ -160,25 +159,18 @@ SESSION_CONTEXTS = [
 
 # ------------------ Core Generator ------------------
 
-def add_metadata_variety(behavior: Dict) -> Dict:
-    """Add varied metadata to behaviors"""
-    
-    # Vary behavior credibility growth (internal tracking only)
-    behavior["_credibility_growth_rate"] = round(random.uniform(0.03, 0.08), 3)
-    
-    return behavior
-
 def generate_dataset(
     num_prompts: int,
     user_id: str,
     session_id: str,
     variety_level: str = "high",
     num_behaviors: int = None,
-    target_tier: str = "PRIMARY"
+    target_tier: str = "PRIMARY",
+    seed: Optional[int] = None
 ) -> Tuple[List[Dict], List[Dict]]:
 
-    prompts = []
-    behaviors: Dict[str, Dict] = {}
+    # One seeded generator drives every draw, ids included
+    rng = np.random.default_rng(seed)
     base_time = int(time.time()) - 86400 * 60  # 60-day history
     
     # Configure parameters based on target tier
@@ -213,7 +205,7 @@ def generate_dataset(
     # Select subset of behaviors if specified
     available_behaviors = list(BEHAVIOR_LIBRARY.keys())
     if num_behaviors and num_behaviors < len(available_behaviors):
-        available_behaviors = random.sample(available_behaviors, num_behaviors)
+        available_behaviors = rng.choice(available_behaviors, num_behaviors, replace=False).tolist()
     
     # Determine behavior distribution based on variety level
     if variety_level == "low":
@@ -223,91 +215,121 @@ def generate_dataset(
     else:  # high
         behavior_weights = [1] * len(available_behaviors)
 
+    # Draw all per-prompt and per-behavior randomness up front
+    num_available = len(available_behaviors)
+    weights = np.asarray(behavior_weights, dtype=np.float64)
+    cumprobs = np.cumsum(weights) / weights.sum()
+    cumprobs[-1] = 1.0  # Guard against float drift at the top of the CDF
+    behavior_idx_all = np.searchsorted(cumprobs, rng.random(num_prompts), side="right")
+    behavior_idx = behavior_idx_all.tolist()
+    # Resolve each behavior's prompt pool once and pick indices into it
+    pools = [BEHAVIOR_LIBRARY[k] for k in available_behaviors]
+    pool_lens = np.array([len(pool) for pool in pools], dtype=np.int64)
+    prompt_choice = (rng.random(num_prompts) * pool_lens[behavior_idx_all]).astype(np.int64).tolist()
+    cluster_mask = (rng.random(num_prompts) < clustering_probability).tolist()
+    time_jitter = rng.integers(60, 3600, size=num_prompts, endpoint=True).tolist()
+    time_spread = rng.integers(
+        86400 * (60 - time_window_days),
+        86400 * 60,
+        size=num_prompts,
+        endpoint=True
+    ).tolist()
+    decay_rates = rng.uniform(*decay_range, size=num_available).round(4).tolist()
+    clarity_scores = rng.uniform(*clarity_range, size=num_available).round(2).tolist()
+    confidences = rng.uniform(*confidence_range, size=num_available).round(2).tolist()
+
+    # Prompt fields are kept as columns and only turned into records at the end
+    prompt_ids: List[str] = generate_ids("prompt", num_prompts, rng)
+    prompt_texts: List[str] = [None] * num_prompts
+    timestamps = np.empty(num_prompts, dtype=np.int64)
+    timestamp = base_time
+
+    # Per-behavior state, indexed like available_behaviors
+    prompt_history_ids: List[List[str]] = [[] for _ in range(num_available)]
+    created_at: List[int] = [None] * num_available
+
     for i in range(num_prompts):
         # Select behavior with weighted distribution
-        behavior_text = random.choices(
-            available_behaviors,
-            weights=behavior_weights
-        )[0]
-        
-        prompt_text = random.choice(BEHAVIOR_LIBRARY[behavior_text])
-
-        prompt_id = generate_id("prompt")
+        bi = behavior_idx[i]
+        prompt_text = pools[bi][prompt_choice[i]]
+        prompt_id = prompt_ids[i]
         
         # Adjust time variance based on target tier
-        if i > 0 and random.random() < clustering_probability:
+        if i > 0 and cluster_mask[i]:
             # Cluster prompts close together
-            timestamp = prompts[-1]["timestamp"] + random.randint(60, 3600)
+            timestamp = timestamp + time_jitter[i]
         else:
             # Space within time window
-            timestamp = base_time + random.randint(
-                86400 * (60 - time_window_days), 
-                86400 * 60
-            )
-
-        prompt = {
-            "prompt_id": prompt_id,
-            "prompt_text": prompt_text,
-            "timestamp": timestamp,
-            "tokens": estimate_tokens(prompt_text),
+            timestamp = base_time + time_spread[i]
+
+        prompt_texts[i] = prompt_text
+        timestamps[i] = timestamp
+
+        history = prompt_history_ids[bi]
+        if not history:
+            created_at[bi] = timestamp
+        history.append(prompt_id)
+
+    # Order prompt columns by timestamp before building records
+    order = np.argsort(timestamps, kind="stable")
+    positions = order.tolist()
+    prompt_ids = [prompt_ids[i] for i in positions]
+    prompt_texts = [prompt_texts[i] for i in positions]
+    timestamps = timestamps[order]
+
+    # Use configured credibility increment; prompts are now in time order
+    credibility, counts, last_seen = accumulate_behaviors(
+        behavior_idx_all[order], timestamps, num_available,
+        base_credibility, credibility_increment, 0.98
+    )
+
+    # Build records only for behaviors that were actually observed
+    behavior_ids = generate_ids("beh", num_available, rng)
+    behaviors = [
+        {
+            "behavior_id": behavior_ids[bi],
+            "behavior_text": behavior_text,
+            "credibility": credibility[bi],
+            "reinforcement_count": counts[bi],
+            "decay_rate": decay_rates[bi],
+            "created_at": created_at[bi],
+            "last_seen": last_seen[bi],
+            "prompt_history_ids": prompt_history_ids[bi],
+            "clarity_score": clarity_scores[bi],
+            "extraction_confidence": confidences[bi],
             "user_id": user_id,
             "session_id": session_id
         }
+        for bi, behavior_text in enumerate(available_behaviors)
+        if counts[bi]
+    ]
 
-        if behavior_text not in behaviors:
-            behaviors[behavior_text] = {
-                "behavior_id": generate_id("beh"),
-                "behavior_text": behavior_text,
-                "credibility": base_credibility,
-                "reinforcement_count": 0,
-                "decay_rate": round(random.uniform(*decay_range), 4),
-                "created_at": timestamp,
-                "last_seen": timestamp,
-                "prompt_history_ids": [],
-                "clarity_score": round(random.uniform(*clarity_range), 2),
-                "extraction_confidence": round(random.uniform(*confidence_range), 2),
-                "user_id": user_id,
-                "session_id": session_id
-            }
-
-        behavior = behaviors[behavior_text]
-        
-        # Add metadata variety (internal use)
-        behavior = add_metadata_variety(behavior)
-        
-        behavior["prompt_history_ids"].append(prompt_id)
-        behavior["reinforcement_count"] += 1
-        behavior["last_seen"] = max(behavior["last_seen"], timestamp)
-        
-        # Use configured credibility increment
-        behavior["credibility"] = round(
-            min(0.98, behavior["credibility"] + credibility_increment), 
-            2
+    tokens = estimate_tokens(prompt_texts)
+
+    prompts = [
+        dict(zip(PROMPT_KEYS, row))
+        for row in zip(
+            prompt_ids, prompt_texts, timestamps.tolist(), tokens.tolist(),
+            repeat(user_id), repeat(session_id)
         )
-        
-        prompts.append(prompt)
+    ]
 
-    return sorted(prompts, key=lambda x: x["timestamp"]), list(behaviors.values())
+    return prompts, behaviors
 
 def clean_behaviors_for_export(behaviors: List[Dict]) -> List[Dict]:
-    """Remove internal fields before export"""
-    cleaned = []
+    """Remove internal fields before export (in place, no copies)"""
     for b in behaviors:
-        b_clean = {k: v for k, v in b.items() if not k.startswith("_")}
-        cleaned.append(b_clean)
-    return cleaned
+        for key in [k for k in b if k.startswith("_")]:
+            del b[key]
+    return behaviors
 
 # ------------------ Save to Local Directory ------------------
 
-def save_to_local(data: List[Dict], filename: str):
-    import os
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    full_path = os.path.join(OUTPUT_DIR, filename)
-    with open(full_path, "w") as f:
-        json.dump(data, f, indent=2)
-
-    print(f"✓ Saved {len(data)} records → {full_path}")
+def save_to_local(data: Iterable[Dict], filename: str, pretty: bool = False):
+    """Stream records to a JSON array in OUTPUT_DIR (see dataset_io.save_records)"""
+    full_path = ensure_output_dir(OUTPUT_DIR) / filename
+    count = save_records(data, full_path, pretty)
+    print(f"✓ Saved {count} records → {full_path}")
 
 def print_statistics(prompts: List[Dict], behaviors: List[Dict]):
     """Print dataset statistics"""
@@ -333,8 +355,13 @@ def print_statistics(prompts: List[Dict], behaviors: List[Dict]):
 # ------------------ Main ------------------
 
 if __name__ == "__main__":
-    USER_ID = f"user_{random.randint(100,999)}"
-    SESSION_ID = f"session_{random.randint(1000,9999)}"
+    # Set CBAC_SEED for a reproducible dataset: the same ids, prompts and
+    # behaviors on every run (timestamps are still relative to the run time)
+    SEED = int(os.environ["CBAC_SEED"]) if os.environ.get("CBAC_SEED") else None
+    id_rng = np.random.default_rng(SEED)
+    
+    USER_ID = f"user_{id_rng.integers(100, 1000)}"
+    SESSION_ID = f"session_{id_rng.integers(1000, 10000)}"
 
     NUM_PROMPTS = int(input("Enter number of prompts to generate: "))
     VARIETY = input("Variety level (low/medium/high) [default: high]: ").lower() or "high"
@@ -358,7 +385,8 @@ if __name__ == "__main__":
         session_id=SESSION_ID,
         variety_level=VARIETY,
         num_behaviors=NUM_BEHAVIORS,
-        target_tier=TARGET_TIER
+        target_tier=TARGET_TIER,
+        seed=SEED
     )
 
     timestamp = int(time.time())
@@ -1,14 +1,22 @@
-import json
-import random
+import os
+import re
 import time
 import hashlib
-import uuid
-from typing import List, Dict, Tuple, Optional
+from itertools import repeat
+from typing import List, Dict, Tuple, Optional, Iterable
+
+import numpy as np
+
+from dataset_io import ensure_output_dir, save_records
+from dataset_kernels import accumulate_behaviors, estimate_tokens, generate_ids
 
 # ------------------ CONFIGURATION ------------------
 
 OUTPUT_DIR = "./behavior_dataset/"
 
+# Field order of exported prompt records ("is_noise" is validation ground-truth)
+PROMPT_KEYS = ("prompt_id", "prompt_text", "timestamp", "tokens", "user_id", "session_id", "is_noise")
+
 # ------------------ DYNAMIC CONTENT LIBRARIES ------------------
 
 # 1. Fillers for Template Generation
@@ -84,6 +92,15 @@ BEHAVIOR_TEMPLATES = {
     ]
 }
 
+# Templates split once into literal segments (even indices) and
+# placeholders (odd indices) so filling is just a join
+PLACEHOLDER_PATTERN = re.compile(r"(\{topic\}|\{action\})")
+
+BEHAVIOR_TEMPLATES_COMPILED = {
+    key: [PLACEHOLDER_PATTERN.split(template) for template in templates]
+    for key, templates in BEHAVIOR_TEMPLATES.items()
+}
+
 # 3. Noise Library (Negative Testing Data)
 NOISE_PROMPTS = [
     "Hello there", "Good morning", "Thank you", "That's cool", 
@@ -94,20 +111,31 @@ NOISE_PROMPTS = [
 
 # ------------------ UTILITIES ------------------
 
-def generate_id(prefix: str) -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+class RNGPool:
+    """Serves random picks from a list out of one pre-drawn batch of indices."""
+    def __init__(self, rng: np.random.Generator, choices: List[str], size: int):
+        self.rng = rng
+        self.choices = choices
+        self.size = max(1, size)
+        self._refill()
+
+    def _refill(self):
+        self._indices = self.rng.integers(0, len(self.choices), size=self.size).tolist()
+        self._cursor = 0
 
-def estimate_tokens(text: str) -> float:
-    return round(len(text) / 4, 1)
+    def next(self) -> str:
+        if self._cursor == len(self._indices):
+            self._refill()
+        choice = self.choices[self._indices[self._cursor]]
+        self._cursor += 1
+        return choice
 
-def fill_template(template: str) -> str:
-    """Dynamically fills templates with random topics/actions."""
-    t = template.replace("{topic}", random.choice(TOPICS))
-    t = t.replace("{action}", random.choice(ACTIONS))
-    # Handle double replacements if needed (topic vs topic)
-    while "{topic}" in t:
-        t = t.replace("{topic}", random.choice(TOPICS), 1)
-    return t
+def fill_template(segments: List[str], topics: RNGPool, actions: RNGPool) -> str:
+    """Dynamically fills a pre-split template with random topics/actions."""
+    parts = segments.copy()
+    for i in range(1, len(parts), 2):
+        parts[i] = topics.next() if parts[i] == "{topic}" else actions.next()
+    return "".join(parts)
 
 # ------------------ ARCHETYPES ------------------
 
@@ -150,11 +178,12 @@ def generate_dataset(
     user_id: str,
     session_id: str,
     archetype_name: str = "Random",
-    target_tier: str = "PRIMARY"
+    target_tier: str = "PRIMARY",
+    seed: Optional[int] = None
 ) -> Tuple[List[Dict], List[Dict]]:
     
-    prompts = []
-    behaviors: Dict[str, Dict] = {}
+    # One seeded generator drives every draw, ids included
+    rng = np.random.default_rng(seed)
     
     # Setup timing logic
     base_time = int(time.time()) - (86400 * 30) # Start 30 days ago
@@ -175,78 +204,89 @@ def generate_dataset(
         base_cred = 0.30
         cred_inc = 0.05
 
-    for _ in range(num_prompts):
-        # 1. Determine if this is Noise or Signal
-        is_noise = random.random() < archetype.noise_prob
-        
-        prompt_text = ""
-        behavior_key = None
+    # Draw all per-prompt and per-behavior randomness up front.
+    # Default weight is 1 if not specified in archetype ("Random" is uniform).
+    weights = np.array([archetype.weights.get(k, 1) for k in available_behaviors], dtype=np.float64)
+    noise_mask_all = rng.random(num_prompts) < archetype.noise_prob
+    noise_idx = rng.integers(0, len(NOISE_PROMPTS), size=num_prompts).tolist()
+    cumprobs = np.cumsum(weights) / weights.sum()
+    cumprobs[-1] = 1.0  # Guard against float drift at the top of the CDF
+    behavior_idx_all = np.searchsorted(cumprobs, rng.random(num_prompts), side="right")
+    behavior_idx = behavior_idx_all.tolist()
+    template_choice = rng.random(num_prompts).tolist()
+    time_gaps = rng.integers(30, 600, size=num_prompts, endpoint=True)
+    clarity_scores = rng.uniform(0.7, 0.99, size=len(available_behaviors)).round(2).tolist()
+    confidences = rng.uniform(0.7, 0.99, size=len(available_behaviors)).round(2).tolist()
+    # Templates hold at most two {topic} and one {action} placeholder
+    topic_pool = RNGPool(rng, TOPICS, num_prompts * 2)
+    action_pool = RNGPool(rng, ACTIONS, num_prompts)
+
+    # Timing Logic (Simulate reading/thinking time between prompts)
+    timestamps = current_time_cursor + np.cumsum(time_gaps, dtype=np.int64)
+
+    # Prompt fields are kept as columns and only turned into records at the end
+    prompt_ids: List[str] = generate_ids("prompt", num_prompts, rng)
+    prompt_texts: List[str] = [None] * num_prompts
+
+    # Per-behavior prompt history, indexed like available_behaviors
+    prompt_history_ids: List[List[str]] = [[] for _ in available_behaviors]
+
+    # 1. Noise prompts only need their text; they never trigger behavior updates
+    noise_positions = np.flatnonzero(noise_mask_all).tolist()
+    for i in noise_positions:
+        prompt_texts[i] = NOISE_PROMPTS[noise_idx[i]]
+
+    # 2. Signal prompts fill a template and extend their behavior's history
+    signal_positions = np.flatnonzero(~noise_mask_all).tolist()
+    for i in signal_positions:
+        # Select behavior based on Archetype weights
+        bi = behavior_idx[i]
         
-        if is_noise:
-            prompt_text = random.choice(NOISE_PROMPTS)
-            # Noise usually doesn't trigger behavior updates, 
-            # but we track the prompt.
-        else:
-            # Select behavior based on Archetype weights
-            if archetype.name == "Random":
-                behavior_key = random.choice(available_behaviors)
-            else:
-                # Default weight is 1 if not specified in archetype
-                weights = [archetype.weights.get(k, 1) for k in available_behaviors]
-                behavior_key = random.choices(available_behaviors, weights=weights, k=1)[0]
-            
-            # Select and Fill Template
-            template = random.choice(BEHAVIOR_TEMPLATES[behavior_key])
-            prompt_text = fill_template(template)
-
-        # 2. Timing Logic (Simulate reading/thinking time)
-        current_time_cursor += random.randint(30, 600) 
-        prompt_id = generate_id("prompt")
-
-        prompt_entry = {
-            "prompt_id": prompt_id,
-            "prompt_text": prompt_text,
-            "timestamp": current_time_cursor,
-            "tokens": estimate_tokens(prompt_text),
-            "user_id": user_id,
-            "session_id": session_id,
-            "is_noise": is_noise  # Helpful for validation ground-truth
+        # Select and Fill Template
+        templates = BEHAVIOR_TEMPLATES_COMPILED[available_behaviors[bi]]
+        template = templates[int(template_choice[i] * len(templates))]
+        prompt_texts[i] = fill_template(template, topic_pool, action_pool)
+        prompt_history_ids[bi].append(prompt_ids[i])
+
+    # Update behaviors from their signal prompts
+    credibility, counts, last_seen = accumulate_behaviors(
+        behavior_idx_all[signal_positions], timestamps[signal_positions],
+        len(available_behaviors), base_cred, cred_inc
+    )
+    behavior_ids = generate_ids("beh", len(available_behaviors), rng)
+    behaviors = [
+        {
+            "behavior_id": behavior_ids[bi],
+            "behavior_text": behavior_key,
+            "credibility": credibility[bi],
+            "reinforcement_count": counts[bi],
+            "last_seen": last_seen[bi],
+            "prompt_history_ids": prompt_history_ids[bi],
+            # Mock analytics metrics
+            "clarity_score": clarity_scores[bi],
+            "confidence": confidences[bi]
         }
-        prompts.append(prompt_entry)
-
-        # 3. Behavior Logic (Only if not noise)
-        if not is_noise and behavior_key:
-            if behavior_key not in behaviors:
-                behaviors[behavior_key] = {
-                    "behavior_id": generate_id("beh"),
-                    "behavior_text": behavior_key,
-                    "credibility": base_cred,
-                    "reinforcement_count": 0,
-                    "last_seen": current_time_cursor,
-                    "prompt_history_ids": [],
-                    # Mock analytics metrics
-                    "clarity_score": round(random.uniform(0.7, 0.99), 2),
-                    "confidence": round(random.uniform(0.7, 0.99), 2)
-                }
-            
-            # Update existing behavior
-            b_obj = behaviors[behavior_key]
-            b_obj["reinforcement_count"] += 1
-            b_obj["last_seen"] = current_time_cursor
-            b_obj["prompt_history_ids"].append(prompt_id)
-            # Cap credibility at 1.0
-            b_obj["credibility"] = min(1.0, round(b_obj["credibility"] + cred_inc, 2))
-
-    return prompts, list(behaviors.values())
+        for bi, behavior_key in enumerate(available_behaviors)
+        if counts[bi]
+    ]
+
+    tokens = estimate_tokens(prompt_texts)
+    prompts = [
+        dict(zip(PROMPT_KEYS, row))
+        for row in zip(
+            prompt_ids, prompt_texts, timestamps.tolist(), tokens.tolist(),
+            repeat(user_id), repeat(session_id), noise_mask_all.tolist()
+        )
+    ]
+
+    return prompts, behaviors
 
 # ------------------ EXECUTION & SAVING ------------------
 
-def save_batch(data: List[Dict], prefix: str, run_id: str):
-    import os
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def save_batch(data: Iterable[Dict], prefix: str, run_id: str, pretty: bool = False):
+    """Stream records to a JSON array in OUTPUT_DIR (see dataset_io.save_records)."""
     filename = f"{prefix}_{run_id}.json"
-    with open(os.path.join(OUTPUT_DIR, filename), "w") as f:
-        json.dump(data, f, indent=2)
+    save_records(data, ensure_output_dir(OUTPUT_DIR) / filename, pretty)
     print(f"Saved {filename}")
 
 if __name__ == "__main__":
@@ -259,18 +299,26 @@ if __name__ == "__main__":
     
     all_prompts_meta = []
     
-    for _ in range(BATCH_SIZE):
-        user_id = f"user_{uuid.uuid4().hex[:6]}"
-        session_id = f"sess_{uuid.uuid4().hex[:6]}"
+    # Set CBAC_SEED for reproducible datasets: the same users, archetypes,
+    # prompts and behaviors on every run (timestamps are still relative to
+    # the run time). Each user's dataset is seeded with seed + index.
+    BASE_SEED = int(os.environ["CBAC_SEED"]) if os.environ.get("CBAC_SEED") else None
+    batch_rng = np.random.default_rng(BASE_SEED)
+    archetype_names = list(ARCHETYPES.keys())
+    
+    for user_index in range(BATCH_SIZE):
+        user_id = f"user_{batch_rng.bytes(3).hex()}"
+        session_id = f"sess_{batch_rng.bytes(3).hex()}"
         
         # Pick a random archetype for this user
-        chosen_archetype = random.choice(list(ARCHETYPES.keys()))
+        chosen_archetype = archetype_names[batch_rng.integers(len(archetype_names))]
         
         prompts, behaviors = generate_dataset(
-            num_prompts=random.randint(40, 80), # Larger datasets for better clustering
+            num_prompts=int(batch_rng.integers(40, 80, endpoint=True)), # Larger datasets for better clustering
             user_id=user_id,
             session_id=session_id,
-            archetype_name=chosen_archetype
+            archetype_name=chosen_archetype,
+            seed=None if BASE_SEED is None else BASE_SEED + user_index
         )
         
         # Save individual user files
@@ -0,0 +1,52 @@
+"""
+JSON output helpers shared by the dataset generators
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def dumps_json(data, pretty: bool = False) -> bytes:
+    """Encode data as UTF-8 JSON, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+@lru_cache(maxsize=None)
+def ensure_output_dir(directory: str) -> Path:
+    """Create the output directory on first use and reuse the Path afterwards"""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def save_records(data: Iterable[Dict], path: Path, pretty: bool = False) -> int:
+    """
+    Stream records to a JSON array file, one compact record per line
+
+    The output stays a single JSON array so load_data_to_databases.py can
+    read it unchanged; pretty=True writes the indented debug layout.
+    Returns the number of records written.
+    """
+    count = 0
+    with open(path, "wb") as f:
+        if pretty:
+            data = list(data)
+            f.write(dumps_json(data, pretty=True))
+            count = len(data)
+        else:
+            write = f.write
+            write(b"[")
+            for record in data:
+                write(b",\n" if count else b"\n")
+                write(dumps_json(record))
+                count += 1
+            write(b"\n]\n")
+    return count
@@ -0,0 +1,62 @@
+"""
+Id, token and behavior-accumulation helpers shared by the dataset generators
+"""
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+# Below this size numba's import/compile cost outweighs the loop it speeds up,
+# so numba is only imported once an input reaches it
+NUMBA_MIN_PROMPTS = 100_000
+
+
+def generate_ids(prefix: str, count: int, rng: np.random.Generator) -> List[str]:
+    """Ids like prefix_1a2b3c4d, from one batched draw of 4 random bytes per id"""
+    raw = np.frombuffer(rng.bytes(count * 4), dtype=">u4").tolist()
+    return [f"{prefix}_{value:08x}" for value in raw]
+
+def estimate_tokens(texts: List[str]) -> np.ndarray:
+    """Rough token counts (a quarter of the character count, one decimal)"""
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    return np.round(lengths * 0.25, 1)
+
+def _update_behaviors(behavior_idx, timestamps, count_out, last_seen_out):
+    """Fold each prompt, in timestamp order, into its behavior's count and last_seen"""
+    for i in range(len(behavior_idx)):
+        k = behavior_idx[i]
+        count_out[k] += 1
+        last_seen_out[k] = timestamps[i]  # timestamps are sorted, so the latest wins
+
+@lru_cache(maxsize=None)
+def _update_behaviors_jit() -> Optional[Callable]:
+    """numba-compiled _update_behaviors, imported and wrapped on first use"""
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional; the pure-Python kernel is used instead
+        return None
+    return njit(cache=True)(_update_behaviors)
+
+def accumulate_behaviors(
+    behavior_idx: np.ndarray,
+    timestamps: np.ndarray,
+    num_behaviors: int,
+    base_cred: float,
+    cred_inc: float,
+    cred_cap: float = 1.0
+) -> Tuple[List[float], List[int], List[int]]:
+    """Per-behavior credibility, reinforcement count and last_seen, JIT-compiled for large inputs"""
+    kernel = _update_behaviors_jit() if len(behavior_idx) >= NUMBA_MIN_PROMPTS else None
+    if kernel is not None:
+        count_out = np.zeros(num_behaviors, dtype=np.int64)
+        last_seen_out = np.zeros(num_behaviors, dtype=np.int64)
+        kernel(behavior_idx, timestamps, count_out, last_seen_out)
+    else:
+        count_out = [0] * num_behaviors
+        last_seen_out = [0] * num_behaviors
+        _update_behaviors(behavior_idx.tolist(), timestamps.tolist(), count_out, last_seen_out)
+
+    # Credibility grows linearly with reinforcement, capped and rounded once
+    counts = np.asarray(count_out, dtype=np.int64)
+    cred_out = np.minimum(cred_cap, base_cred + cred_inc * counts).round(2)
+    return cred_out.tolist(), counts.tolist(), np.asarray(last_seen_out).tolist()
@@ -0,0 +1,7 @@
+"""
+Precomputed id strings shared by the test-data scripts
+Index with the number directly instead of formatting ids in loops
+"""
+
+# PROMPT_IDS_STR[i] == f"prompt_{i:03d}"
+PROMPT_IDS_STR = [f"prompt_{i:03d}" for i in range(1001)]
@@ -0,0 +1,85 @@
+"""
+Sample data loaders shared by the pipeline tests
+conftest.py wraps these in session-scoped fixtures; the __main__ blocks call them directly
+"""
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pydantic import AliasChoices, AliasPath, Field, TypeAdapter
+
+from src.models.schemas import BehaviorModel, BehaviorObservation, PromptModel
+from _json_fast import load_file
+
+
+SAMPLE_BEHAVIORS_FILE = 'test-data/behaviors_user_348_1765993674.json'
+SAMPLE_PROMPTS_FILE = 'test-data/prompts_user_348_1765993674.json'
+CLUSTER_DATASET_DIR = Path('test-data/behavior_dataset')
+
+
+class _GeneratedObservation(BehaviorObservation):
+    """BehaviorObservation read straight from a generated behaviors record"""
+    observation_id: str = Field(validation_alias='behavior_id')
+    extraction_confidence: float = Field(ge=0.0, le=1.0, default=0.80, validation_alias='confidence')
+    timestamp: int = Field(
+        default_factory=lambda: int(time.time()),
+        validation_alias=AliasChoices('created_at', 'last_seen')
+    )
+    prompt_id: str = Field(default='unknown', validation_alias=AliasPath('prompt_history_ids', 0))
+    user_id: Optional[str] = 'unknown'
+    session_id: Optional[str] = 'unknown'
+
+
+class _GeneratedPrompt(PromptModel):
+    """PromptModel read straight from a generated prompts record"""
+    user_id: Optional[str] = 'user_348'
+
+
+# Built once; each validates a whole list in a single pydantic-core call
+_BEHAVIORS = TypeAdapter(List[BehaviorModel])
+_PROMPTS = TypeAdapter(List[PromptModel])
+_GENERATED_OBS = TypeAdapter(List[_GeneratedObservation])
+_GENERATED_PROMPTS = TypeAdapter(List[_GeneratedPrompt])
+
+
+def load_sample_data() -> Tuple[list, list]:
+    """Load sample behaviors and prompts"""
+    return load_file(SAMPLE_BEHAVIORS_FILE), load_file(SAMPLE_PROMPTS_FILE)
+
+
+def to_behavior_models(behaviors_data: list) -> List[BehaviorModel]:
+    """Validate raw behavior dicts as BehaviorModel objects"""
+    return _BEHAVIORS.validate_python(behaviors_data)
+
+
+def to_prompt_models(prompts_data: list) -> List[PromptModel]:
+    """Validate raw prompt dicts as PromptModel objects"""
+    return _PROMPTS.validate_python(prompts_data)
+
+
+def find_cluster_dataset() -> Optional[Tuple[str, Path, Path]]:
+    """
+    Find the first generated user dataset in test-data/behavior_dataset
+
+    Returns:
+        (user_id, behaviors_file, prompts_file), or None if no dataset has been generated
+    """
+    behavior_files = sorted(CLUSTER_DATASET_DIR.glob('behaviors_user_*.json'))
+    if not behavior_files:
+        return None
+
+    behavior_file = behavior_files[0]
+    user_id = behavior_file.stem.replace('behaviors_', '')
+    prompt_file = CLUSTER_DATASET_DIR / f'prompts_{user_id}.json'
+
+    return user_id, behavior_file, prompt_file
+
+
+def load_cluster_observations(behavior_file: Path) -> List[BehaviorObservation]:
+    """Decode a generated behaviors file straight into BehaviorObservation objects"""
+    return _GENERATED_OBS.validate_json(Path(behavior_file).read_bytes())
+
+
+def load_cluster_prompts(prompt_file: Path) -> List[PromptModel]:
+    """Decode a generated prompts file straight into PromptModel objects"""
+    return _GENERATED_PROMPTS.validate_json(Path(prompt_file).read_bytes())
@@ -0,0 +1,38 @@
+"""
+HTTP session helper for the API test scripts
+One pooled requests.Session per script, with a default timeout on every request
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Applied to every request that does not pass its own timeout
+DEFAULT_TIMEOUT = 30
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that falls back to a default timeout"""
+
+    def __init__(self, *args, timeout: float = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def make_session(timeout: float = DEFAULT_TIMEOUT, retries: int = 3) -> requests.Session:
+    """Build a keep-alive session so connections to the API are reused
+
+    requests already asks for gzip/deflate responses and keeps connections alive
+    """
+    session = requests.Session()
+    session.mount("http://", TimeoutHTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=retries),
+        timeout=timeout
+    ))
+    return session
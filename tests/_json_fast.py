@@ -0,0 +1,52 @@
+"""
+JSON helpers for the test scripts
+Uses orjson when it is installed and falls back to the stdlib json module
+"""
+import json
+import pickle
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson is optional; stdlib json is used instead
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Read a JSON file as raw bytes and parse it in one call"""
+    return loads(Path(path).read_bytes())
+
+
+def load_file_cached(path: Union[str, Path]) -> Any:
+    """Load a JSON file, reusing a pickle of it saved next to the file while it is newer"""
+    path = Path(path)
+    cache_path = path.with_name(path.name + ".pkl")
+    if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+        return pickle.loads(cache_path.read_bytes())
+    
+    data = load_file(path)
+    cache_path.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    return data
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string, indented by two spaces if requested"""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode()
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes, e.g. for a request body"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
@@ -0,0 +1,20 @@
+"""
+Timing helpers for the test scripts
+Durations come from the monotonic perf_counter_ns clock and are appended to
+tests/timings.jsonl as one {"test": ..., "ns": ...} record per line
+"""
+import time
+from pathlib import Path
+
+from _json_fast import dumps
+
+
+TIMINGS_FILE = Path(__file__).parent / 'timings.jsonl'
+
+tic = time.perf_counter_ns
+
+
+def record(test: str, elapsed_ns: int) -> None:
+    """Append one timing record to TIMINGS_FILE"""
+    with open(TIMINGS_FILE, 'a') as f:
+        f.write(dumps({"test": test, "ns": elapsed_ns}) + "\n")
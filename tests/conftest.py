@@ -3,6 +3,15 @@ import pytest
 import asyncio
 from typing import Generator
 
+from _fixtures import (
+    load_sample_data,
+    find_cluster_dataset,
+    load_cluster_observations,
+    load_cluster_prompts,
+    to_behavior_models,
+    to_prompt_models,
+)
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
@@ -10,3 +19,94 @@ def event_loop() -> Generator:
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture(scope="session")
+def sample_data_raw():
+    """Sample (behaviors, prompts) JSON, parsed once per session."""
+    return load_sample_data()
+
+
+@pytest.fixture(scope="session")
+def sample_behaviors_raw(sample_data_raw):
+    """Sample behavior dicts."""
+    return sample_data_raw[0]
+
+
+@pytest.fixture(scope="session")
+def sample_prompts_raw(sample_data_raw):
+    """Sample prompt dicts."""
+    return sample_data_raw[1]
+
+
+@pytest.fixture(scope="session")
+def sample_behavior_models(sample_behaviors_raw):
+    """Sample behaviors validated as BehaviorModel objects, once per session."""
+    return to_behavior_models(sample_behaviors_raw)
+
+
+@pytest.fixture(scope="session")
+def sample_prompt_models(sample_prompts_raw):
+    """Sample prompts validated as PromptModel objects, once per session."""
+    return to_prompt_models(sample_prompts_raw)
+
+
+@pytest.fixture(scope="session")
+def cluster_dataset():
+    """First generated (user_id, behaviors_file, prompts_file) dataset."""
+    dataset = find_cluster_dataset()
+    if dataset is None:
+        pytest.skip("No behavior files found in test-data/behavior_dataset/")
+    return dataset
+
+
+@pytest.fixture(scope="session")
+def cluster_observations(cluster_dataset):
+    """Generated behaviors decoded into BehaviorObservation objects, once per session."""
+    return load_cluster_observations(cluster_dataset[1])
+
+
+@pytest.fixture(scope="session")
+def cluster_prompts(cluster_dataset):
+    """Generated prompts decoded into PromptModel objects, once per session."""
+    return load_cluster_prompts(cluster_dataset[2])
+
+
+@pytest.fixture(scope="session")
+def llm_services():
+    """Azure OpenAI clients for embeddings and archetypes, created once per session."""
+    from src.services.embedding_service import embedding_service
+    from src.services.archetype_service import archetype_service
+    
+    try:
+        embedding_service.connect()
+        archetype_service.connect()
+    except Exception as e:
+        print(f"Warning: Could not initialize services: {e}")
+    return embedding_service, archetype_service
+
+
+@pytest.fixture(scope="session")
+def mongodb():
+    """MongoDB connection shared by the whole session; skips when MongoDB is down."""
+    from src.database.mongodb_service import mongodb_service
+    
+    try:
+        mongodb_service.connect()
+    except Exception as e:
+        pytest.skip(f"MongoDB unavailable: {e}")
+    yield mongodb_service
+    mongodb_service.disconnect()
+
+
+@pytest.fixture(scope="session")
+def qdrant():
+    """Qdrant connection shared by the whole session; skips when Qdrant is down."""
+    from src.database.qdrant_service import qdrant_service
+    
+    try:
+        qdrant_service.connect()
+    except Exception as e:
+        pytest.skip(f"Qdrant unavailable: {e}")
+    yield qdrant_service
+    qdrant_service.disconnect()
@@ -2,14 +2,29 @@
 Script to load prompts and behaviors from JSON files into databases
 - Prompts are saved to MongoDB
 - Behaviors are vectorized and saved to Qdrant
+- With DUAL_WRITE=1, behaviors are also saved to MongoDB
 """
 import json
 import logging
+import multiprocessing
 import sys
 import os
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; files are then parsed whole
+    ijson = None
 
 # Add parent directory to path for imports
 parent_dir = Path(__file__).parent.parent
@@ -21,7 +36,7 @@ os.chdir(parent_dir)
 from src.database.mongodb_service import MongoDBService
 from src.database.qdrant_service import QdrantService
 from src.services.embedding_service import EmbeddingService
-from src.models.schemas import BehaviorObservation, PromptModel
+from src.models.schemas import PromptModel
 
 # Setup logging
 logging.basicConfig(
@@ -30,75 +45,286 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prompts are streamed into MongoDB in batches of this many records
+PROMPT_BATCH_SIZE = 500
+
+# Upper bound on worker processes used to load prompt files concurrently
+MAX_LOAD_WORKERS = 8
+
+# Behaviors per embed-and-upsert chunk (one embedding request each)
+EMBEDDING_BATCH_SIZE = 256
+
+# Behavior documents per MongoDB insert_many call
+BEHAVIOR_BATCH_SIZE = 2000
+
+# DUAL_WRITE=1 also copies behaviors into MongoDB; Qdrant already holds them as payloads
+STORE_BEHAVIORS_IN_MONGO = os.environ.get("DUAL_WRITE", "0") == "1"
+
+# FIXTURE_LOAD=1 inserts into MongoDB unordered and unacknowledged (fixture data is re-runnable)
+FIXTURE_LOAD = os.environ.get("FIXTURE_LOAD") == "1"
+
+
+def parse_json_bytes(raw: bytes):
+    """Parse a whole JSON document, via orjson when it is installed"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-def load_json_file(filepath: str) -> List[Dict]:
-    """Load data from JSON file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        logger.info(f"Loaded {len(data)} records from {filepath}")
-        return data
-    except Exception as e:
-        logger.error(f"Error loading {filepath}: {e}")
-        return []
+
+def iter_json_records(filepath: str) -> Iterator[Dict]:
+    """Yield the records of a JSON array file one at a time"""
+    with open(filepath, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from parse_json_bytes(f.read())
 
 
 def save_prompts_to_mongodb(prompts_data: List[Dict], mongo_service: MongoDBService) -> bool:
     """Save prompts to MongoDB"""
     try:
-        # Convert to PromptModel objects
-        prompts = [PromptModel(**prompt_data) for prompt_data in prompts_data]
+        # Convert to PromptModel objects; fixture data is trusted, so skip
+        # validation (model_construct also drops keys the model doesn't define)
+        prompts = [PromptModel.model_construct(**prompt_data) for prompt_data in prompts_data]
         
         # Bulk insert
-        success = mongo_service.insert_prompts_bulk(prompts)
+        success = mongo_service.insert_prompts_bulk(prompts, fast=FIXTURE_LOAD)
         
         if success:
-            logger.info(f"Successfully saved {len(prompts)} prompts to MongoDB")
+            logger.info("Successfully saved %s prompts to MongoDB", len(prompts))
         else:
             logger.error("Failed to save prompts to MongoDB")
         
         return success
     except Exception as e:
-        logger.error(f"Error saving prompts: {e}")
+        logger.error("Error saving prompts: %s", e)
         return False
 
 
-def save_behaviors_to_qdrant(
-    behaviors_data: List[Dict], 
-    qdrant_service: QdrantService, 
-    embedding_service: EmbeddingService
-) -> bool:
-    """Vectorize behaviors and save complete data to Qdrant"""
+def normalize_behavior(behavior: Dict, user_id: str, now: int) -> Dict:
+    """Add user_id and fill in the fields the models require"""
+    behavior['user_id'] = user_id
+    # Ensure extraction_confidence exists (map from confidence if not present)
+    behavior.setdefault('extraction_confidence', behavior.get('confidence', 0.80))
+    # Ensure timestamp exists (use last_seen if available)
+    behavior.setdefault('timestamp', behavior.get('last_seen', now))
+    # Ensure decay_rate exists
+    behavior.setdefault('decay_rate', 0.01)
+    return behavior
+
+
+def iter_behavior_chunks(behaviors_files: List[Path]) -> Iterator[List[Dict]]:
+    """Stream normalized behaviors from every file, EMBEDDING_BATCH_SIZE at a time"""
+    for behaviors_file in behaviors_files:
+        logger.info("Loading %s...", behaviors_file.name)
+        # Extract user_id from filename (e.g., behaviors_user_665390.json -> user_665390)
+        user_id = behaviors_file.stem.replace('behaviors_', '')
+        # The fallback timestamp is taken once per file rather than per record
+        now = int(time.time())
+        try:
+            records = iter_json_records(str(behaviors_file))
+            while True:
+                chunk = [normalize_behavior(b, user_id, now) for b in islice(records, EMBEDDING_BATCH_SIZE)]
+                if not chunk:
+                    break
+                yield chunk
+        except Exception as e:
+            logger.error("Error loading %s: %s", behaviors_file, e)
+
+
+def stream_prompts_to_mongodb(prompts_file: Path, mongo_service: MongoDBService) -> Tuple[int, bool]:
+    """Stream one prompts file into MongoDB, PROMPT_BATCH_SIZE records at a time"""
+    # Extract user_id from filename (e.g., prompts_user_665390.json -> user_665390)
+    logger.info("Loading %s...", prompts_file.name)
+    user_id = prompts_file.stem.replace('prompts_', '')
+    total = 0
+    success = True
     try:
-        # Extract behavior texts for vectorization
-        behavior_texts = [b['behavior_text'] for b in behaviors_data]
-        
-        logger.info(f"Generating embeddings for {len(behavior_texts)} behaviors...")
-        
-        # Generate embeddings
-        embeddings = embedding_service.generate_embeddings_batch(behavior_texts)
-        
-        if not embeddings:
-            logger.error("Failed to generate embeddings")
-            return False
-        
-        logger.info(f"Generated {len(embeddings)} embeddings")
-        
-        # Save complete behavior data with embeddings to Qdrant
-        success = qdrant_service.insert_behaviors_with_embeddings(
-            embeddings=embeddings,
-            behaviors=behaviors_data
+        records = iter_json_records(str(prompts_file))
+        while True:
+            batch = list(islice(records, PROMPT_BATCH_SIZE))
+            if not batch:
+                break
+            # Add user_id to each prompt that lacks one
+            for prompt in batch:
+                prompt['user_id'] = prompt.get('user_id') or user_id
+            success = save_prompts_to_mongodb(batch, mongo_service) and success
+            total += len(batch)
+    except Exception as e:
+        logger.error("Error loading %s: %s", prompts_file, e)
+        return total, False
+    
+    logger.info("Streamed %s prompts from %s", total, prompts_file.name)
+    return total, success
+
+
+def stream_prompts_file_in_worker(prompts_file: Path) -> Tuple[int, bool]:
+    """Process-pool entry point: stream one prompts file over the worker's own connection"""
+    mongo_service = MongoDBService()
+    mongo_service.connect()
+    try:
+        return stream_prompts_to_mongodb(prompts_file, mongo_service)
+    finally:
+        mongo_service.disconnect()
+
+
+def save_all_prompts_to_mongodb(prompts_files: List[Path], mongo_service: MongoDBService) -> Tuple[int, bool]:
+    """Stream every prompts file into MongoDB, one worker process per file
+    
+    Parsing is CPU-bound, so files are spread over processes rather than
+    threads. A single file is streamed in-process over mongo_service.
+    """
+    if len(prompts_files) == 1:
+        file_results = [stream_prompts_to_mongodb(prompts_files[0], mongo_service)]
+    else:
+        # spawn, not fork: the loader already has client and worker threads running
+        with ProcessPoolExecutor(
+            max_workers=min(MAX_LOAD_WORKERS, len(prompts_files)),
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            file_results = list(executor.map(stream_prompts_file_in_worker, prompts_files))
+    prompts_count = sum(count for count, _ in file_results)
+    return prompts_count, all(success for _, success in file_results) and prompts_count > 0
+
+
+def save_behaviors_to_mongodb(behaviors_data: List[Dict], mongo_service: MongoDBService) -> bool:
+    """Save behaviors to MongoDB (for complete metadata access)"""
+    try:
+        # Map generated fields straight to BehaviorObservation documents, in
+        # the model's field order, lazily and without building models
+        now = int(time.time())
+        behavior_docs = (
+            {
+                "observation_id": b.get('behavior_id'),
+                "behavior_text": b.get('behavior_text'),
+                "embedding": None,
+                "credibility": b.get('credibility', 0.75),
+                "clarity_score": b.get('clarity_score', 0.75),
+                "extraction_confidence": b.get('confidence', 0.80),  # Map confidence to extraction_confidence
+                "timestamp": b.get('last_seen', now),  # Use last_seen as timestamp
+                "prompt_id": b.get('prompt_history_ids', ['unknown'])[0] if b.get('prompt_history_ids') else 'unknown',
+                "decay_rate": 0.01,  # Default decay rate
+                "user_id": b.get('user_id', 'unknown'),
+                "session_id": b.get('session_id', 'unknown'),
+                "bw": None,
+                "abw": None
+            }
+            for b in behaviors_data
         )
         
+        success = True
+        while True:
+            batch = list(islice(behavior_docs, BEHAVIOR_BATCH_SIZE))
+            if not batch:
+                break
+            success = mongo_service.insert_behavior_documents(batch, fast=FIXTURE_LOAD) and success
         if success:
-            logger.info(f"Successfully saved {len(embeddings)} complete behaviors to Qdrant")
+            logger.info("✓ Successfully saved %s behaviors to MongoDB", len(behaviors_data))
+        return success
+    except Exception as e:
+        logger.error("Failed to save behaviors to MongoDB: %s", e)
+        return False
+
+
+def embed_and_insert_chunk(
+    chunk: List[Dict],
+    qdrant_service: QdrantService,
+    embedding_service: EmbeddingService
+) -> bool:
+    """Vectorize one chunk of behaviors and save it to Qdrant"""
+    embeddings = embedding_service.generate_embeddings_batch([b['behavior_text'] for b in chunk])
+    
+    if embeddings.size == 0:
+        logger.error("Failed to generate embeddings")
+        return False
+    
+    # Save complete behavior data with embeddings to Qdrant
+    success = qdrant_service.insert_behaviors_with_embeddings(
+        embeddings=embeddings,
+        behaviors=chunk,
+        wait=False
+    )
+    
+    if success:
+        logger.info("Saved a chunk of %s behaviors to Qdrant", len(chunk))
+    return success
+
+
+def save_behaviors_chunk(
+    chunk: List[Dict],
+    qdrant_service: QdrantService,
+    embedding_service: EmbeddingService,
+    mongo_service: MongoDBService
+) -> Tuple[bool, bool]:
+    """Save one chunk to Qdrant and, with DUAL_WRITE, to MongoDB"""
+    qdrant_success = embed_and_insert_chunk(chunk, qdrant_service, embedding_service)
+    mongo_success = save_behaviors_to_mongodb(chunk, mongo_service) if STORE_BEHAVIORS_IN_MONGO else True
+    return qdrant_success, mongo_success
+
+
+def save_behaviors(
+    behaviors_files: List[Path],
+    qdrant_service: QdrantService, 
+    embedding_service: EmbeddingService,
+    mongo_service: MongoDBService
+) -> Tuple[int, bool, bool]:
+    """Stream behaviors from the files, vectorize them and save complete data to Qdrant
+    
+    Returns the behavior count and the Qdrant and MongoDB success flags.
+    """
+    count = 0
+    qdrant_success = True
+    mongo_success = True
+    try:
+        # Two workers pipeline the chunks: one embeds the next chunk while the
+        # other upserts the previous one. At most two chunks are in flight, so
+        # memory stays bounded by the chunk size rather than the file sizes
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pending = deque()
+            for chunk in iter_behavior_chunks(behaviors_files):
+                count += len(chunk)
+                pending.append(executor.submit(
+                    save_behaviors_chunk, chunk, qdrant_service, embedding_service, mongo_service
+                ))
+                if len(pending) >= 2:
+                    chunk_qdrant, chunk_mongo = pending.popleft().result()
+                    qdrant_success = qdrant_success and chunk_qdrant
+                    mongo_success = mongo_success and chunk_mongo
+            for future in pending:
+                chunk_qdrant, chunk_mongo = future.result()
+                qdrant_success = qdrant_success and chunk_qdrant
+                mongo_success = mongo_success and chunk_mongo
+        
+        qdrant_success = qdrant_success and count > 0
+        if qdrant_success:
+            logger.info("Successfully saved %s complete behaviors to Qdrant", count)
         else:
             logger.error("Failed to save behaviors to Qdrant")
         
-        return success
+        return count, qdrant_success, mongo_success
     except Exception as e:
-        logger.error(f"Error saving behaviors: {e}")
-        return False
+        logger.error("Error saving behaviors: %s", e)
+        return count, False, False
+
+
+def find_data_files(base_dir: Path) -> Tuple[List[Path], List[Path]]:
+    """Split the directory's prompts_user_*/behaviors_user_* JSON files, largest first
+    
+    Largest first keeps the thread pools from finishing on one big straggler.
+    """
+    prompts_files = []
+    behaviors_files = []
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json'):
+                continue
+            if entry.name.startswith('prompts_user_'):
+                prompts_files.append((entry.stat().st_size, Path(entry.path)))
+            elif entry.name.startswith('behaviors_user_'):
+                behaviors_files.append((entry.stat().st_size, Path(entry.path)))
+    
+    def largest_first(files):
+        return [path for _, path in sorted(files, key=lambda item: -item[0])]
+    
+    return largest_first(prompts_files), largest_first(behaviors_files)
 
 
 def main():
@@ -108,65 +334,21 @@ def main():
     
     # Check if directory exists
     if not base_dir.exists():
-        logger.error(f"Directory not found: {base_dir}")
+        logger.error("Directory not found: %s", base_dir)
         return False
     
-    # Find all prompts and behaviors files
-    prompts_files = sorted(base_dir.glob("prompts_user_*.json"))
-    behaviors_files = sorted(base_dir.glob("behaviors_user_*.json"))
+    # Find all prompts and behaviors files in one directory pass
+    prompts_files, behaviors_files = find_data_files(base_dir)
     
     if not prompts_files:
-        logger.error(f"No prompts_user_*.json files found in {base_dir}")
+        logger.error("No prompts_user_*.json files found in %s", base_dir)
         return False
     
     if not behaviors_files:
-        logger.error(f"No behaviors_user_*.json files found in {base_dir}")
+        logger.error("No behaviors_user_*.json files found in %s", base_dir)
         return False
     
-    logger.info(f"Found {len(prompts_files)} prompt files and {len(behaviors_files)} behavior files")
-    
-    # Load data from all JSON files
-    logger.info("\nLoading data from JSON files...")
-    all_prompts_data = []
-    all_behaviors_data = []
-    
-    for prompts_file in prompts_files:
-        logger.info(f"Loading {prompts_file.name}...")
-        prompts_data = load_json_file(str(prompts_file))
-        if prompts_data:
-            # Extract user_id from filename (e.g., prompts_user_665390.json -> user_665390)
-            user_id = prompts_file.stem.replace('prompts_', '')
-            # Add user_id to each prompt
-            for prompt in prompts_data:
-                if 'user_id' not in prompt or not prompt['user_id']:
-                    prompt['user_id'] = user_id
-            all_prompts_data.extend(prompts_data)
-    
-    for behaviors_file in behaviors_files:
-        logger.info(f"Loading {behaviors_file.name}...")
-        behaviors_data = load_json_file(str(behaviors_file))
-        if behaviors_data:
-            # Extract user_id from filename (e.g., behaviors_user_665390.json -> user_665390)
-            user_id = behaviors_file.stem.replace('behaviors_', '')
-            # Add user_id and ensure all required fields exist
-            for behavior in behaviors_data:
-                behavior['user_id'] = user_id
-                # Ensure extraction_confidence exists (map from confidence if not present)
-                if 'extraction_confidence' not in behavior:
-                    behavior['extraction_confidence'] = behavior.get('confidence', 0.80)
-                # Ensure timestamp exists (use last_seen if available)
-                if 'timestamp' not in behavior:
-                    behavior['timestamp'] = behavior.get('last_seen', int(time.time()))
-                # Ensure decay_rate exists
-                if 'decay_rate' not in behavior:
-                    behavior['decay_rate'] = 0.01
-            all_behaviors_data.extend(behaviors_data)
-    
-    if not all_prompts_data or not all_behaviors_data:
-        logger.error("Failed to load data from files")
-        return False
-    
-    logger.info(f"\nTotal loaded: {len(all_prompts_data)} prompts, {len(all_behaviors_data)} behaviors")
+    logger.info("Found %s prompt files and %s behavior files", len(prompts_files), len(behaviors_files))
     
     # Initialize services
     logger.info("Initializing database services...")
@@ -181,59 +363,38 @@ def main():
         qdrant_service.connect()
         embedding_service.connect()
         
-        # Save prompts to MongoDB
+        # The writes are independent, so run them side by side: prompts
+        # stream into MongoDB while behaviors are streamed, embedded and sent
+        # to Qdrant (and MongoDB with DUAL_WRITE)
         logger.info("\n" + "="*50)
-        logger.info("Saving prompts to MongoDB...")
-        logger.info("="*50)
-        prompts_success = save_prompts_to_mongodb(all_prompts_data, mongo_service)
-        
-        # Save behaviors to Qdrant (with vectorization)
-        logger.info("\n" + "="*50)
-        logger.info("Vectorizing and saving behaviors to Qdrant...")
-        logger.info("="*50)
-        behaviors_success = save_behaviors_to_qdrant(
-            all_behaviors_data, 
-            qdrant_service, 
-            embedding_service
-        )
-        
-        # Save behaviors to MongoDB (for complete metadata access)
-        logger.info("\n" + "="*50)
-        logger.info("Saving behaviors to MongoDB...")
+        if STORE_BEHAVIORS_IN_MONGO:
+            logger.info("Saving prompts to MongoDB and behaviors to Qdrant and MongoDB...")
+        else:
+            logger.info("Saving prompts to MongoDB and behaviors to Qdrant...")
         logger.info("="*50)
-        try:
-            # Convert generated format to BehaviorObservation format
-            behavior_observations = []
-            for b in all_behaviors_data:
-                # Map generated fields to BehaviorObservation fields
-                obs = BehaviorObservation(
-                    observation_id=b.get('behavior_id'),
-                    user_id=b.get('user_id', 'unknown'),
-                    behavior_text=b.get('behavior_text'),
-                    timestamp=b.get('last_seen', int(time.time())),  # Use last_seen as timestamp
-                    prompt_id=b.get('prompt_history_ids', ['unknown'])[0] if b.get('prompt_history_ids') else 'unknown',
-                    session_id=b.get('session_id', 'unknown'),
-                    credibility=b.get('credibility', 0.75),
-                    clarity_score=b.get('clarity_score', 0.75),
-                    extraction_confidence=b.get('confidence', 0.80),  # Map confidence to extraction_confidence
-                    decay_rate=0.01  # Default decay rate
-                )
-                behavior_observations.append(obs)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            prompts_future = executor.submit(save_all_prompts_to_mongodb, prompts_files, mongo_service)
+            behaviors_future = executor.submit(
+                save_behaviors,
+                behaviors_files,
+                qdrant_service, 
+                embedding_service,
+                mongo_service
+            )
             
-            mongo_service.insert_behaviors_bulk(behavior_observations)
-            behaviors_mongo_success = True
-            logger.info(f"✓ Successfully saved {len(behavior_observations)} behaviors to MongoDB")
-        except Exception as e:
-            logger.error(f"Failed to save behaviors to MongoDB: {e}")
-            behaviors_mongo_success = False
+            prompts_count, prompts_success = prompts_future.result()
+            behaviors_count, behaviors_success, behaviors_mongo_success = behaviors_future.result()
         
         # Summary
         logger.info("\n" + "="*50)
         logger.info("SUMMARY")
         logger.info("="*50)
-        logger.info(f"Prompts saved to MongoDB: {'✓' if prompts_success else '✗'} ({len(all_prompts_data)} records)")
-        logger.info(f"Behaviors saved to Qdrant: {'✓' if behaviors_success else '✗'} ({len(all_behaviors_data)} records)")
-        logger.info(f"Behaviors saved to MongoDB: {'✓' if behaviors_mongo_success else '✗'} ({len(all_behaviors_data)} records)")
+        logger.info("Prompts saved to MongoDB: %s (%s records)", '✓' if prompts_success else '✗', prompts_count)
+        logger.info("Behaviors saved to Qdrant: %s (%s records)", '✓' if behaviors_success else '✗', behaviors_count)
+        if STORE_BEHAVIORS_IN_MONGO:
+            logger.info("Behaviors saved to MongoDB: %s (%s records)", '✓' if behaviors_mongo_success else '✗', behaviors_count)
+        else:
+            logger.info("Behaviors saved to MongoDB: skipped (set DUAL_WRITE=1 to enable)")
         
         if prompts_success and behaviors_success and behaviors_mongo_success:
             logger.info("\n✓ All data loaded successfully!")
@@ -243,7 +404,7 @@ def main():
             return False
         
     except Exception as e:
-        logger.error(f"Error during execution: {e}")
+        logger.error("Error during execution: %s", e)
         return False
     
     finally:
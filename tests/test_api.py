@@ -2,22 +2,30 @@
 API Test Script
 Tests all 5 API endpoints with sample data
 """
+import pytest
 import requests
-import json
+import sys
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 
+from _http import make_session
+from _json_fast import dumps, dumps_bytes, load_file_cached, loads
+
+
+# These drive a running API server (python main.py)
+pytestmark = pytest.mark.integration
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call so connections to the API are reused
+SESSION = make_session()
+
 
 def load_sample_data() -> tuple:
     """Load sample behaviors and prompts"""
-    with open('test-data/behaviors_user_348_1765993674.json', 'r') as f:
-        behaviors = json.load(f)
-    
-    with open('test-data/prompts_user_348_1765993674.json', 'r') as f:
-        prompts = json.load(f)
+    behaviors = load_file_cached('test-data/behaviors_user_348_1765993674.json')
+    prompts = load_file_cached('test-data/prompts_user_348_1765993674.json')
     
     return behaviors, prompts
 
@@ -33,9 +41,9 @@ def test_health_check():
     """Test health check endpoint"""
     print_section("Test 1: Health Check")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print(f"Response: {dumps(loads(response.content), indent=True)}")
     
     assert response.status_code == 200
     print("✓ Health check passed")
@@ -54,7 +62,12 @@ def test_analyze_behaviors(user_id: str, behaviors: list, prompts: list) -> Dict
     print(f"Analyzing {len(behaviors)} behaviors and {len(prompts)} prompts...")
     
     start_time = time.time()
-    response = requests.post(f"{BASE_URL}/analyze-behaviors", json=payload)
+    body = dumps_bytes(payload)
+    response = SESSION.post(
+        f"{BASE_URL}/analyze-behaviors",
+        data=body,
+        headers={"Content-Type": "application/json"}
+    )
     elapsed = time.time() - start_time
     
     print(f"Status Code: {response.status_code}")
@@ -62,7 +75,7 @@ def test_analyze_behaviors(user_id: str, behaviors: list, prompts: list) -> Dict
     
     assert response.status_code == 200
     
-    profile = response.json()
+    profile = loads(response.content)
     print(f"\nProfile Summary:")
     print(f"  User ID: {profile['user_id']}")
     print(f"  Archetype: {profile.get('archetype', 'None')}")
@@ -75,16 +88,25 @@ def test_analyze_behaviors(user_id: str, behaviors: list, prompts: list) -> Dict
     return profile
 
 
-def test_get_user_profile(user_id: str):
-    """Test /get-user-profile endpoint"""
+def test_get_user_profile(
+    user_id: str,
+    response: Optional[requests.Response] = None,
+    expected: Optional[Dict[str, Any]] = None
+):
+    """Test /get-user-profile endpoint (optionally with an already fetched response)
+    
+    When expected is the profile analyze-behaviors returned, the stored
+    profile is also checked against it.
+    """
     print_section("Test 3: Get User Profile")
     
-    response = requests.get(f"{BASE_URL}/get-user-profile/{user_id}")
+    if response is None:
+        response = SESSION.get(f"{BASE_URL}/get-user-profile/{user_id}")
     print(f"Status Code: {response.status_code}")
     
     assert response.status_code == 200
     
-    profile = response.json()
+    profile = loads(response.content)
     print(f"\nRetrieved Profile:")
     print(f"  User ID: {profile['user_id']}")
     print(f"  Generated At: {profile['generated_at']}")
@@ -92,21 +114,28 @@ def test_get_user_profile(user_id: str):
     print(f"  PRIMARY Behaviors: {len(profile['primary_behaviors'])}")
     print(f"  SECONDARY Behaviors: {len(profile['secondary_behaviors'])}")
     
+    if expected is not None:
+        assert profile['user_id'] == expected['user_id']
+        assert len(profile['primary_behaviors']) == len(expected['primary_behaviors'])
+        assert len(profile['secondary_behaviors']) == len(expected['secondary_behaviors'])
+        print("  Matches the analyze-behaviors result")
+    
     print("\n✓ Profile retrieved successfully")
     
     return profile
 
 
-def test_list_core_behaviors(user_id: str):
-    """Test /list-core-behaviors endpoint"""
+def test_list_core_behaviors(user_id: str, response: Optional[requests.Response] = None):
+    """Test /list-core-behaviors endpoint (optionally with an already fetched response)"""
     print_section("Test 4: List Core Behaviors")
     
-    response = requests.get(f"{BASE_URL}/list-core-behaviors/{user_id}")
+    if response is None:
+        response = SESSION.get(f"{BASE_URL}/list-core-behaviors/{user_id}")
     print(f"Status Code: {response.status_code}")
     
     assert response.status_code == 200
     
-    data = response.json()
+    data = loads(response.content)
     print(f"\nCore Behaviors for {data['user_id']}:")
     
     for i, behavior in enumerate(data['canonical_behaviors'], 1):
@@ -130,14 +159,14 @@ def test_update_behavior(behavior_id: str):
     }
     
     print(f"Updating behavior {behavior_id}...")
-    print(f"Updates: {json.dumps(payload['updates'], indent=2)}")
+    print(f"Updates: {dumps(payload['updates'], indent=True)}")
     
-    response = requests.post(f"{BASE_URL}/update-behavior", json=payload)
+    response = SESSION.post(f"{BASE_URL}/update-behavior", json=payload)
     print(f"\nStatus Code: {response.status_code}")
     
     assert response.status_code == 200
     
-    updated = response.json()
+    updated = loads(response.content)
     print(f"\nUpdated Behavior:")
     print(f"  ID: {updated['behavior_id']}")
     print(f"  Text: {updated['behavior_text']}")
@@ -159,12 +188,12 @@ def test_assign_archetype(user_id: str, canonical_behaviors: list):
     
     print(f"Generating archetype for {len(canonical_behaviors)} behaviors...")
     
-    response = requests.post(f"{BASE_URL}/assign-archetype", json=payload)
+    response = SESSION.post(f"{BASE_URL}/assign-archetype", json=payload)
     print(f"Status Code: {response.status_code}")
     
     assert response.status_code == 200
     
-    data = response.json()
+    data = loads(response.content)
     print(f"\nAssigned Archetype:")
     print(f"  User ID: {data['user_id']}")
     print(f"  Archetype: {data['archetype']}")
@@ -174,8 +203,8 @@ def test_assign_archetype(user_id: str, canonical_behaviors: list):
     return data
 
 
-def run_all_tests():
-    """Run all API tests"""
+def run_all_tests() -> int:
+    """Run all API tests; returns the process exit code (0 on success)"""
     print("\n" + "="*70)
     print("  CBIE MVP - API Integration Tests")
     print("="*70)
@@ -193,11 +222,19 @@ def run_all_tests():
         # Test 2: Analyze Behaviors (main pipeline)
         profile = test_analyze_behaviors(user_id, behaviors, prompts)
         
+        # Tests 3 and 4 only read what Test 2 stored, so fetch both at once
+        # and check the responses in order
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            profile_response, core_behaviors_response = executor.map(SESSION.get, [
+                f"{BASE_URL}/get-user-profile/{user_id}",
+                f"{BASE_URL}/list-core-behaviors/{user_id}"
+            ])
+        
         # Test 3: Get User Profile
-        profile = test_get_user_profile(user_id)
+        profile = test_get_user_profile(user_id, profile_response, expected=profile)
         
         # Test 4: List Core Behaviors
-        core_behaviors_data = test_list_core_behaviors(user_id)
+        core_behaviors_data = test_list_core_behaviors(user_id, core_behaviors_response)
         
         # Test 5: Update Behavior
         if profile['primary_behaviors']:
@@ -219,6 +256,7 @@ def run_all_tests():
         print(f"  ✓ Update Behavior")
         print(f"  ✓ Assign Archetype")
         print()
+        return 0
         
     except AssertionError as e:
         print(f"\n✗ Test failed: {e}")
@@ -228,9 +266,10 @@ def run_all_tests():
         print(f"\n✗ Unexpected error: {e}")
         import traceback
         traceback.print_exc()
+    return 1
 
 
 if __name__ == "__main__":
     print("\nMake sure the API server is running (python main.py)")
-    input("Press Enter to start tests...")
-    run_all_tests()
+    with SESSION:
+        sys.exit(run_all_tests())
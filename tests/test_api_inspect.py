@@ -2,21 +2,27 @@
 Simple test to call the cluster-centric API and see cluster data in the response
 Uses the existing /analyze-behaviors endpoint
 """
+import pytest
 import requests
-import json
 import time
 
+from _http import make_session
+from _json_fast import dumps_bytes, load_file, loads
+
+
+# These drive a running API server (python main.py)
+pytestmark = pytest.mark.integration
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call so connections to the API are reused
+SESSION = make_session()
+
 
 def load_sample_data():
     """Load sample behaviors and prompts"""
-    with open('test-data/behavior_dataset/behaviors_user_102_1766084125.json', 'r') as f:
-        behaviors = json.load(f)
-    
-    with open('test-data/behavior_dataset/prompts_user_102_1766084125.json', 'r') as f:
-        prompts = json.load(f)
+    behaviors = load_file('test-data/behavior_dataset/behaviors_user_102_1766084125.json')
+    prompts = load_file('test-data/behavior_dataset/prompts_user_102_1766084125.json')
     
     return behaviors, prompts
 
@@ -45,10 +51,11 @@ def test_existing_api():
     start_time = time.time()
     
     try:
-        response = requests.post(
+        body = dumps_bytes(payload)
+        response = SESSION.post(
             f"{BASE_URL}/analyze-behaviors",
-            json=payload,
-            timeout=30
+            data=body,
+            headers={"Content-Type": "application/json"}
         )
         
         elapsed = time.time() - start_time
@@ -60,7 +67,7 @@ def test_existing_api():
             print(f"\n❌ ERROR: {response.text}")
             return
         
-        profile = response.json()
+        profile = loads(response.content)
         
         # Display results
         print("\n" + "="*70)
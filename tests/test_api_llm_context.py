@@ -2,11 +2,20 @@
 Quick API Test Script for LLM Context Endpoint
 Tests the /api/v1/profile/{user_id}/llm-context endpoint
 """
+import pytest
 import requests
 import json
 
+from _http import make_session
+
+# These drive a running API server (python main.py)
+pytestmark = pytest.mark.integration
+
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call so connections to the API are reused
+SESSION = make_session()
+
 def test_llm_context_endpoint():
     """Test the LLM context generation endpoint"""
     
@@ -19,7 +28,7 @@ def test_llm_context_endpoint():
     print("Test 1: Basic Request (default parameters)")
     print("-" * 80)
     try:
-        response = requests.get(f"{BASE_URL}/profile/user_665390/llm-context")
+        response = SESSION.get(f"{BASE_URL}/profile/user_665390/llm-context")
         response.raise_for_status()
         data = response.json()
         
@@ -44,7 +53,7 @@ def test_llm_context_endpoint():
             "min_confidence": 0.45,
             "max_behaviors": 3
         }
-        response = requests.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
+        response = SESSION.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -60,7 +69,7 @@ def test_llm_context_endpoint():
     print("-" * 80)
     try:
         params = {"include_archetype": False}
-        response = requests.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
+        response = SESSION.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -79,7 +88,7 @@ def test_llm_context_endpoint():
             "max_behaviors": 10,
             "min_strength": 25.0
         }
-        response = requests.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
+        response = SESSION.get(f"{BASE_URL}/profile/user_665390/llm-context", params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -94,7 +103,7 @@ def test_llm_context_endpoint():
     print("\nTest 5: Non-existent User")
     print("-" * 80)
     try:
-        response = requests.get(f"{BASE_URL}/profile/nonexistent_user/llm-context")
+        response = SESSION.get(f"{BASE_URL}/profile/nonexistent_user/llm-context")
         print(f"❌ Unexpected success: {response.status_code}")
     except requests.exceptions.HTTPError as e:
         if "404" in str(e):
@@ -108,4 +117,5 @@ def test_llm_context_endpoint():
     print("=" * 80)
 
 if __name__ == "__main__":
-    test_llm_context_endpoint()
+    with SESSION:
+        test_llm_context_endpoint()
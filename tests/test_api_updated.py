@@ -1,27 +1,53 @@
 """
 API Test Script - Updated for Storage Scenarios
 Tests both production (from storage) and import (new data) scenarios
+
+Checks raise explicitly instead of using assert, so the script can also be run
+with optimizations enabled: PYTHONOPTIMIZE=2 python tests/test_api_updated.py
 """
+import pytest
 import requests
-import json
+import os
+import sys
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from _http import make_session
+from _json_fast import dumps, load_file, loads
+from _timing import record, tic
 
 
+# These drive a running API server (python main.py)
+pytestmark = pytest.mark.integration
+
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One keep-alive session shared by all tests instead of a new connection per call;
+# the import test runs the whole pipeline, so the default timeout is longer
+# than in test_api.py
+SESSION = make_session(timeout=60, retries=0)
+
 
 def load_sample_data() -> tuple:
     """Load sample behaviors and prompts"""
-    with open('test-data/behaviors_user_348_1765993674.json', 'r') as f:
-        behaviors = json.load(f)
-    
-    with open('test-data/prompts_user_348_1765993674.json', 'r') as f:
-        prompts = json.load(f)
+    behaviors = load_file('test-data/behaviors_user_348_1765993674.json')
+    prompts = load_file('test-data/prompts_user_348_1765993674.json')
     
     return behaviors, prompts
 
 
+def expect_ok(response: requests.Response):
+    """Raise AssertionError unless the response is 200 (unlike assert, survives python -O)"""
+    if response.status_code != 200:
+        raise AssertionError(f"Expected status 200, got {response.status_code}: {response.text}")
+
+
+def print_json(label: str, obj: Any):
+    """Print label followed by obj as indented JSON in a single write"""
+    sys.stdout.write(f"{label}{dumps(obj, indent=True)}\n")
+
+
 def print_section(title: str):
     """Print section header"""
     print("\n" + "="*70)
@@ -33,11 +59,11 @@ def test_health_check():
     """Test health check endpoint"""
     print_section("Test 1: Health Check")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print_json("Response: ", loads(response.content))
     
-    assert response.status_code == 200
+    expect_ok(response)
     print("✓ Health check passed")
 
 
@@ -58,16 +84,17 @@ def test_analyze_behaviors_import(user_id: str, behaviors: list, prompts: list)
     print("  • Store behavior metadata in MongoDB")
     print("  • Run complete analysis pipeline")
     
-    start_time = time.time()
-    response = requests.post(f"{BASE_URL}/analyze-behaviors", json=payload)
-    elapsed = time.time() - start_time
+    t0 = tic()
+    response = SESSION.post(f"{BASE_URL}/analyze-behaviors", json=payload)
+    elapsed_ns = tic() - t0
+    record("test_analyze_behaviors_import", elapsed_ns)
     
     print(f"\nStatus Code: {response.status_code}")
-    print(f"Time Taken: {elapsed:.2f} seconds")
+    print(f"Time Taken: {elapsed_ns / 1e9:.2f} seconds")
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    profile = response.json()
+    profile = loads(response.content)
     print(f"\nProfile Summary:")
     print(f"  User ID: {profile['user_id']}")
     print(f"  Archetype: {profile.get('archetype', 'None')}")
@@ -90,20 +117,21 @@ def test_analyze_behaviors_from_storage(user_id: str) -> Dict[str, Any]:
     print("  • Fetch prompts from MongoDB")
     print("  • Run analysis on stored data")
     
-    start_time = time.time()
-    response = requests.post(f"{BASE_URL}/analyze-behaviors-from-storage?user_id={user_id}")
-    elapsed = time.time() - start_time
+    t0 = tic()
+    response = SESSION.post(f"{BASE_URL}/analyze-behaviors-from-storage?user_id={user_id}")
+    elapsed_ns = tic() - t0
+    record("test_analyze_behaviors_from_storage", elapsed_ns)
     
     print(f"\nStatus Code: {response.status_code}")
-    print(f"Time Taken: {elapsed:.2f} seconds")
+    print(f"Time Taken: {elapsed_ns / 1e9:.2f} seconds")
     
     if response.status_code == 404:
         print("\n⚠ No data found in storage. Run import test first.")
         return None
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    profile = response.json()
+    profile = loads(response.content)
     print(f"\nProfile Summary:")
     print(f"  User ID: {profile['user_id']}")
     print(f"  Archetype: {profile.get('archetype', 'None')}")
@@ -116,16 +144,17 @@ def test_analyze_behaviors_from_storage(user_id: str) -> Dict[str, Any]:
     return profile
 
 
-def test_get_user_profile(user_id: str):
-    """Test /get-user-profile endpoint"""
+def test_get_user_profile(user_id: str, response: Optional[requests.Response] = None):
+    """Test /get-user-profile endpoint (optionally with an already fetched response)"""
     print_section("Test 4: Get User Profile")
     
-    response = requests.get(f"{BASE_URL}/get-user-profile/{user_id}")
+    if response is None:
+        response = SESSION.get(f"{BASE_URL}/get-user-profile/{user_id}")
     print(f"Status Code: {response.status_code}")
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    profile = response.json()
+    profile = loads(response.content)
     print(f"\nRetrieved Profile:")
     print(f"  User ID: {profile['user_id']}")
     print(f"  Generated At: {profile['generated_at']}")
@@ -138,16 +167,17 @@ def test_get_user_profile(user_id: str):
     return profile
 
 
-def test_list_core_behaviors(user_id: str):
-    """Test /list-core-behaviors endpoint"""
+def test_list_core_behaviors(user_id: str, response: Optional[requests.Response] = None):
+    """Test /list-core-behaviors endpoint (optionally with an already fetched response)"""
     print_section("Test 5: List Core Behaviors")
     
-    response = requests.get(f"{BASE_URL}/list-core-behaviors/{user_id}")
+    if response is None:
+        response = SESSION.get(f"{BASE_URL}/list-core-behaviors/{user_id}")
     print(f"Status Code: {response.status_code}")
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    data = response.json()
+    data = loads(response.content)
     print(f"\nCore Behaviors for {data['user_id']}:")
     
     for i, behavior in enumerate(data['canonical_behaviors'], 1):
@@ -171,14 +201,14 @@ def test_update_behavior(behavior_id: str):
     }
     
     print(f"Updating behavior {behavior_id}...")
-    print(f"Updates: {json.dumps(payload['updates'], indent=2)}")
+    print_json("Updates: ", payload['updates'])
     
-    response = requests.post(f"{BASE_URL}/update-behavior", json=payload)
+    response = SESSION.post(f"{BASE_URL}/update-behavior", json=payload)
     print(f"\nStatus Code: {response.status_code}")
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    updated = response.json()
+    updated = loads(response.content)
     print(f"\nUpdated Behavior:")
     print(f"  ID: {updated['behavior_id']}")
     print(f"  Text: {updated['behavior_text']}")
@@ -189,6 +219,34 @@ def test_update_behavior(behavior_id: str):
     return updated
 
 
+def test_update_behaviors_bulk(behavior_ids: list):
+    """Test /update-behaviors-bulk endpoint"""
+    print_section("Test 6b: Update Behaviors (Bulk)")
+    
+    last_seen = int(time.time())
+    payload = {
+        "updates": [
+            {"behavior_id": behavior_id, "updates": {"last_seen": last_seen}}
+            for behavior_id in behavior_ids
+        ]
+    }
+    
+    print(f"Updating {len(behavior_ids)} behaviors in one request...")
+    
+    response = SESSION.post(f"{BASE_URL}/update-behaviors-bulk", json=payload)
+    print(f"\nStatus Code: {response.status_code}")
+    
+    expect_ok(response)
+    
+    updated = loads(response.content)
+    if len(updated) != len(behavior_ids):
+        raise AssertionError(f"Expected {len(behavior_ids)} updated behaviors, got {len(updated)}")
+    
+    print(f"\n✓ {len(updated)} behaviors updated successfully")
+    
+    return updated
+
+
 def test_assign_archetype(user_id: str, canonical_behaviors: list):
     """Test /assign-archetype endpoint"""
     print_section("Test 7: Assign Archetype")
@@ -200,12 +258,12 @@ def test_assign_archetype(user_id: str, canonical_behaviors: list):
     
     print(f"Generating archetype for {len(canonical_behaviors)} behaviors...")
     
-    response = requests.post(f"{BASE_URL}/assign-archetype", json=payload)
+    response = SESSION.post(f"{BASE_URL}/assign-archetype", json=payload)
     print(f"Status Code: {response.status_code}")
     
-    assert response.status_code == 200
+    expect_ok(response)
     
-    data = response.json()
+    data = loads(response.content)
     print(f"\nAssigned Archetype:")
     print(f"  User ID: {data['user_id']}")
     print(f"  Archetype: {data['archetype']}")
@@ -215,8 +273,8 @@ def test_assign_archetype(user_id: str, canonical_behaviors: list):
     return data
 
 
-def run_all_tests():
-    """Run all API tests"""
+def run_all_tests() -> int:
+    """Run all API tests; returns the process exit code (0 on success)"""
     print("\n" + "="*70)
     print("  CBIE MVP - API Integration Tests")
     print("  Testing Both Storage Scenarios")
@@ -239,16 +297,27 @@ def run_all_tests():
         profile = test_analyze_behaviors_from_storage(user_id)
         
         if profile:
+            # Tests 4 and 5 only read what the import stored, so fetch both
+            # at once and check the responses in order
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                profile_response, core_behaviors_response = executor.map(SESSION.get, [
+                    f"{BASE_URL}/get-user-profile/{user_id}",
+                    f"{BASE_URL}/list-core-behaviors/{user_id}"
+                ])
+            
             # Test 4: Get User Profile
-            profile = test_get_user_profile(user_id)
+            profile = test_get_user_profile(user_id, profile_response)
             
             # Test 5: List Core Behaviors
-            core_behaviors_data = test_list_core_behaviors(user_id)
+            core_behaviors_data = test_list_core_behaviors(user_id, core_behaviors_response)
             
             # Test 6: Update Behavior
             if profile['primary_behaviors']:
                 behavior_id = profile['primary_behaviors'][0]['behavior_id']
                 test_update_behavior(behavior_id)
+                
+                # Test 6b: Update Behaviors (Bulk)
+                test_update_behaviors_bulk([b['behavior_id'] for b in profile['primary_behaviors']])
             
             # Test 7: Assign Archetype
             canonical_texts = [b['behavior_text'] for b in core_behaviors_data['canonical_behaviors'][:3]]
@@ -264,6 +333,7 @@ def run_all_tests():
         print(f"  ✓ Get User Profile")
         print(f"  ✓ List Core Behaviors")
         print(f"  ✓ Update Behavior")
+        print(f"  ✓ Update Behaviors (Bulk)")
         print(f"  ✓ Assign Archetype")
         print()
         print("Storage Architecture Verified:")
@@ -271,6 +341,7 @@ def run_all_tests():
         print(f"  ✓ Prompts stored in MongoDB")
         print(f"  ✓ Profiles stored in MongoDB")
         print()
+        return 0
         
     except AssertionError as e:
         print(f"\n✗ Test failed: {e}")
@@ -280,9 +351,24 @@ def run_all_tests():
         print(f"\n✗ Unexpected error: {e}")
         import traceback
         traceback.print_exc()
+    return 1
+
+
+def test_storage_scenarios():
+    """pytest entry point for the whole run; skips when the API server is down"""
+    try:
+        SESSION.get(f"{BASE_URL}/health", timeout=5)
+    except requests.exceptions.ConnectionError:
+        pytest.skip("API server is not running on http://localhost:8000")
+    
+    assert run_all_tests() == 0
 
 
 if __name__ == "__main__":
+    # Block-buffer the report instead of flushing on every line; input()
+    # still flushes the prompt, and everything else is flushed at exit
+    sys.stdout.reconfigure(line_buffering=False)
+    
     print("\n" + "="*70)
     print("  CBIE MVP - Storage Architecture Testing")
     print("="*70)
@@ -293,5 +379,8 @@ if __name__ == "__main__":
     print("And MongoDB + Qdrant are accessible")
     print("="*70)
     
-    input("\nPress Enter to start tests...")
-    run_all_tests()
+    # Only wait for a human when there is one; CI and piped runs start right away
+    if sys.stdin.isatty() and not os.environ.get("CI"):
+        input("\nPress Enter to start tests...")
+    with SESSION:
+        sys.exit(run_all_tests())
@@ -3,86 +3,115 @@ Test calculation engine formulas with examples from documentation
 """
 import pytest
 import math
-import sys
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+import numpy as np
 
 from src.services.calculation_engine import CalculationEngine
 from src.models.schemas import BehaviorModel, TierEnum
 
 
-def test_behavior_weight_calculation():
+@pytest.fixture(scope="module")
+def engine() -> CalculationEngine:
+    """One CalculationEngine shared by every test in this module"""
+    return CalculationEngine()
+
+
+@pytest.mark.parametrize("credibility,clarity_score,extraction_confidence,expected", [
+    # Example from documentation
+    (0.95, 0.76, 0.77, 0.858),
+])
+def test_behavior_weight_calculation(engine, credibility, clarity_score, extraction_confidence, expected):
     """Test BW formula with documented example"""
-    engine = CalculationEngine()
-    
-    # Example from documentation:
-    # credibility=0.95, clarity=0.76, extraction_confidence=0.77
-    # Expected: BW ≈ 0.858
-    
     bw = engine.calculate_behavior_weight(
-        credibility=0.95,
-        clarity_score=0.76,
-        extraction_confidence=0.77
+        credibility=credibility,
+        clarity_score=clarity_score,
+        extraction_confidence=extraction_confidence
     )
     
-    assert abs(bw - 0.858) < 0.001, f"Expected BW ≈ 0.858, got {bw}"
+    assert math.isclose(bw, expected, abs_tol=1e-3), f"Expected BW ≈ {expected}, got {bw}"
 
 
-def test_adjusted_behavior_weight_calculation():
+@pytest.mark.parametrize("behavior_weight,reinforcement_count,decay_rate,days_since_last_seen,expected", [
+    # Example from documentation
+    (0.858, 17, 0.012, 3, 0.967),
+])
+def test_adjusted_behavior_weight_calculation(
+    engine, behavior_weight, reinforcement_count, decay_rate, days_since_last_seen, expected
+):
     """Test ABW formula with documented example"""
-    engine = CalculationEngine()
-    
-    # Example from documentation:
-    # BW=0.858, reinforcement_count=17, decay_rate=0.012, days_since_last_seen=3
-    # Expected: ABW ≈ 0.967
-    
     abw = engine.calculate_adjusted_behavior_weight(
-        behavior_weight=0.858,
-        reinforcement_count=17,
-        decay_rate=0.012,
-        days_since_last_seen=3
+        behavior_weight=behavior_weight,
+        reinforcement_count=reinforcement_count,
+        decay_rate=decay_rate,
+        days_since_last_seen=days_since_last_seen
     )
     
-    assert abs(abw - 0.967) < 0.001, f"Expected ABW ≈ 0.967, got {abw}"
+    assert math.isclose(abw, expected, abs_tol=1e-3), f"Expected ABW ≈ {expected}, got {abw}"
 
 
-def test_cluster_cbi_calculation():
-    """Test Cluster CBI formula"""
-    engine = CalculationEngine()
+def test_behavior_weight_batch_matches_scalar(engine):
+    """Test vectorized BW against the scalar formula over many rows"""
+    rng = np.random.default_rng(0)
+    credibility, clarity, confidence = rng.uniform(0.0, 1.0, size=(3, 1000))
     
-    # Example: 3 behaviors with ABWs = [0.967, 0.945, 0.873]
-    # Expected: CBI ≈ 0.928
+    bw = engine.calculate_behavior_weights_batch(credibility, clarity, confidence)
+    expected = [
+        engine.calculate_behavior_weight(c, cl, co)
+        for c, cl, co in zip(credibility, clarity, confidence)
+    ]
     
-    abw_list = [0.967, 0.945, 0.873]
-    cbi = engine.calculate_cluster_cbi(abw_list)
+    assert np.allclose(bw, expected, atol=1e-9)
+
+
+def test_adjusted_behavior_weight_batch_matches_scalar(engine):
+    """Test vectorized ABW against the scalar formula over many rows"""
+    rng = np.random.default_rng(0)
+    bw = rng.uniform(0.0, 1.0, size=1000)
+    reinforcement = rng.integers(0, 50, size=1000)
+    decay = rng.uniform(0.0, 0.05, size=1000)
+    days = rng.uniform(0.0, 365.0, size=1000)
+    
+    abw = engine.calculate_adjusted_behavior_weights_batch(bw, reinforcement, decay, days)
+    expected = [
+        engine.calculate_adjusted_behavior_weight(b, int(r), d, t)
+        for b, r, d, t in zip(bw, reinforcement, decay, days)
+    ]
     
-    expected = sum(abw_list) / len(abw_list)
-    assert abs(cbi - 0.928) < 0.001, f"Expected CBI ≈ 0.928, got {cbi}"
-    assert abs(cbi - expected) < 0.0001
+    assert np.allclose(abw, expected, atol=1e-9)
 
 
-def test_tier_assignment():
-    """Test tier classification thresholds"""
-    engine = CalculationEngine()
+@pytest.mark.parametrize("abw_list,expected", [
+    # 3 behaviors; CBI is their mean ABW
+    ([0.967, 0.945, 0.873], 0.928),
+    # Empty cluster
+    ([], 0.0),
+])
+def test_cluster_cbi_calculation(engine, abw_list, expected):
+    """Test Cluster CBI formula"""
+    cbi = engine.calculate_cluster_cbi(abw_list)
     
+    assert math.isclose(cbi, expected, abs_tol=1e-3), f"Expected CBI ≈ {expected}, got {cbi}"
+    if abw_list:
+        assert math.isclose(cbi, sum(abw_list) / len(abw_list), abs_tol=1e-4)
+
+
+@pytest.mark.parametrize("cbi,tier", [
     # PRIMARY: CBI ≥ 1.0
-    assert engine.assign_tier(1.5) == TierEnum.PRIMARY
-    assert engine.assign_tier(1.0) == TierEnum.PRIMARY
-    
+    (1.5, TierEnum.PRIMARY),
+    (1.0, TierEnum.PRIMARY),
     # SECONDARY: 0.7 ≤ CBI < 1.0
-    assert engine.assign_tier(0.9) == TierEnum.SECONDARY
-    assert engine.assign_tier(0.7) == TierEnum.SECONDARY
-    
+    (0.9, TierEnum.SECONDARY),
+    (0.7, TierEnum.SECONDARY),
     # NOISE: CBI < 0.7
-    assert engine.assign_tier(0.5) == TierEnum.NOISE
-    assert engine.assign_tier(0.0) == TierEnum.NOISE
+    (0.5, TierEnum.NOISE),
+    (0.0, TierEnum.NOISE),
+])
+def test_tier_assignment(engine, cbi, tier):
+    """Test tier classification thresholds"""
+    assert engine.assign_tier(cbi) == tier
 
 
-def test_canonical_behavior_selection():
+def test_canonical_behavior_selection(engine):
     """Test canonical behavior selection (highest ABW)"""
-    engine = CalculationEngine()
     
     behaviors_with_abw = [
         {"behavior_id": "beh_1", "abw": 0.8},
@@ -95,21 +124,22 @@ def test_canonical_behavior_selection():
     assert canonical_id == "beh_2"
 
 
-def test_days_since_last_seen():
+@pytest.mark.parametrize("seconds_ago,expected", [
+    (3 * 86400, 3.0),  # 3 days ago
+    (0, 0.0),
+    (-86400, 0.0),  # last_seen in the future is clamped to 0
+])
+def test_days_since_last_seen(engine, seconds_ago, expected):
     """Test days calculation"""
-    engine = CalculationEngine()
-    
     current = 1766000000
-    last_seen = current - (3 * 86400)  # 3 days ago
     
-    days = engine.calculate_days_since_last_seen(last_seen, current)
+    days = engine.calculate_days_since_last_seen(current - seconds_ago, current)
     
-    assert abs(days - 3.0) < 0.001
+    assert math.isclose(days, expected, abs_tol=1e-3)
 
 
-def test_complete_behavior_metrics():
+def test_complete_behavior_metrics(engine):
     """Test complete metrics calculation for a behavior"""
-    engine = CalculationEngine()
     
     behavior = BehaviorModel(
         behavior_id="beh_test",
@@ -133,10 +163,10 @@ def test_complete_behavior_metrics():
     assert "days_since_last_seen" in metrics
     
     # Verify BW calculation
-    assert abs(metrics["bw"] - 0.858) < 0.001
+    assert math.isclose(metrics["bw"], 0.858, abs_tol=1e-3)
     
     # Verify days
-    assert abs(metrics["days_since_last_seen"] - 3.0) < 0.001
+    assert math.isclose(metrics["days_since_last_seen"], 3.0, abs_tol=1e-3)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,27 @@
 """
 Test the cluster-centric API endpoint
 """
+import pytest
 import requests
-import json
 import time
 
+from _http import make_session
+from _json_fast import dumps_bytes, load_file_cached, loads
+
+
+# These drive a running API server (python main.py)
+pytestmark = pytest.mark.integration
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One pooled session for every call so connections to the API are reused
+SESSION = make_session()
+
 
 def load_sample_data():
     """Load sample behaviors and prompts"""
-    with open('test-data/behavior_dataset/behaviors_user_102_1766084125.json', 'r') as f:
-        behaviors = json.load(f)
-    
-    with open('test-data/behavior_dataset/prompts_user_102_1766084125.json', 'r') as f:
-        prompts = json.load(f)
+    behaviors = load_file_cached('test-data/behavior_dataset/behaviors_user_102_1766084125.json')
+    prompts = load_file_cached('test-data/behavior_dataset/prompts_user_102_1766084125.json')
     
     return behaviors, prompts
 
@@ -44,9 +50,11 @@ def test_cluster_centric_api():
     start_time = time.time()
     
     try:
-        response = requests.post(
+        body = dumps_bytes(payload)
+        response = SESSION.post(
             f"{BASE_URL}/analyze-behaviors-cluster-centric",
-            json=payload,
+            data=body,
+            headers={"Content-Type": "application/json"},
             timeout=30
         )
         
@@ -59,7 +67,7 @@ def test_cluster_centric_api():
             print(f"\n❌ ERROR: {response.text}")
             return
         
-        profile = response.json()
+        profile = loads(response.content)
         
         # Display results
         print("\n" + "="*70)
@@ -81,83 +89,107 @@ def test_cluster_centric_api():
         clusters = profile.get('behavior_clusters', [])
         print(f"\n🎯 Behavior Clusters: {len(clusters)} total")
         
-        primary = [c for c in clusters if c['tier'] == 'PRIMARY']
-        secondary = [c for c in clusters if c['tier'] == 'SECONDARY']
-        noise = [c for c in clusters if c['tier'] == 'NOISE']
+        # Bucket clusters by tier in a single pass
+        buckets = {'PRIMARY': [], 'SECONDARY': [], 'NOISE': []}
+        for c in clusters:
+            if c['tier'] in buckets:
+                buckets[c['tier']].append(c)
+        primary, secondary, noise = buckets['PRIMARY'], buckets['SECONDARY'], buckets['NOISE']
         
         print(f"   PRIMARY: {len(primary)}")
         print(f"   SECONDARY: {len(secondary)}")
         print(f"   NOISE: {len(noise)}")
         
+        # Each section below is collected into a list of lines and written
+        # with a single print instead of one print per line
+        
         # Show PRIMARY clusters in detail
-        print(f"\n" + "="*70)
-        print("  PRIMARY CLUSTERS (Detailed)")
-        print("="*70)
+        lines = [
+            f"\n" + "="*70,
+            "  PRIMARY CLUSTERS (Detailed)",
+            "="*70
+        ]
         
         for i, cluster in enumerate(primary[:3], 1):
-            print(f"\n{i}. {cluster['canonical_label']}")
-            print(f"   Cluster ID: {cluster['cluster_id']}")
-            print(f"   Cluster Size: {cluster['cluster_size']} observations")
-            print(f"   Cluster Strength: {cluster['cluster_strength']:.4f}")
-            print(f"   Confidence: {cluster['confidence']:.4f}")
-            print(f"     └─ Consistency: {cluster['consistency_score']:.4f}")
-            print(f"     └─ Reinforcement: {cluster['reinforcement_score']:.4f}")
-            print(f"     └─ Clarity Trend: {cluster['clarity_trend']:.4f}")
-            print(f"   Temporal:")
-            print(f"     └─ Days Active: {cluster['days_active']:.1f}")
-            print(f"     └─ First Seen: {cluster['first_seen']}")
-            print(f"     └─ Last Seen: {cluster['last_seen']}")
-            print(f"   Evidence:")
-            print(f"     └─ Prompts: {len(cluster['all_prompt_ids'])}")
-            print(f"     └─ Variations: {len(cluster['wording_variations'])}")
+            all_variations = cluster['wording_variations']
+            lines += [
+                f"\n{i}. {cluster['canonical_label']}",
+                f"   Cluster ID: {cluster['cluster_id']}",
+                f"   Cluster Size: {cluster['cluster_size']} observations",
+                f"   Cluster Strength: {cluster['cluster_strength']:.4f}",
+                f"   Confidence: {cluster['confidence']:.4f}",
+                f"     └─ Consistency: {cluster['consistency_score']:.4f}",
+                f"     └─ Reinforcement: {cluster['reinforcement_score']:.4f}",
+                f"     └─ Clarity Trend: {cluster['clarity_trend']:.4f}",
+                f"   Temporal:",
+                f"     └─ Days Active: {cluster['days_active']:.1f}",
+                f"     └─ First Seen: {cluster['first_seen']}",
+                f"     └─ Last Seen: {cluster['last_seen']}",
+                f"   Evidence:",
+                f"     └─ Prompts: {len(cluster['all_prompt_ids'])}",
+                f"     └─ Variations: {len(all_variations)}"
+            ]
             
             # Show wording variations
-            variations = cluster['wording_variations'][:3]
+            variations = all_variations[:3]
             if variations:
-                print(f"   Wording Variations (showing {len(variations)}):")
-                for j, var in enumerate(variations, 1):
-                    print(f"     {j}. {var[:60]}...")
+                lines.append(f"   Wording Variations (showing {len(variations)}):")
+                lines += [f"     {j}. {var[:60]}..." for j, var in enumerate(variations, 1)]
+        
+        print("\n".join(lines))
         
         # Show SECONDARY clusters
-        print(f"\n" + "="*70)
-        print("  SECONDARY CLUSTERS")
-        print("="*70)
+        lines = [
+            f"\n" + "="*70,
+            "  SECONDARY CLUSTERS",
+            "="*70
+        ]
         
         for i, cluster in enumerate(secondary[:3], 1):
-            print(f"\n{i}. {cluster['canonical_label']}")
-            print(f"   Size: {cluster['cluster_size']}, Strength: {cluster['cluster_strength']:.4f}, "
-                  f"Confidence: {cluster['confidence']:.4f}")
+            lines.append(f"\n{i}. {cluster['canonical_label']}")
+            lines.append(f"   Size: {cluster['cluster_size']}, Strength: {cluster['cluster_strength']:.4f}, "
+                         f"Confidence: {cluster['confidence']:.4f}")
         
-        # Validation
-        print(f"\n" + "="*70)
-        print("  VALIDATION")
-        print("="*70)
+        print("\n".join(lines))
         
-        print("\n✓ API returns behavior_clusters[] as primary data structure")
-        print(f"  Found {len(clusters)} clusters in response")
-        
-        print("\n✓ Each cluster contains full aggregated evidence:")
+        # Validation
+        lines = [
+            f"\n" + "="*70,
+            "  VALIDATION",
+            "="*70,
+            "\n✓ API returns behavior_clusters[] as primary data structure",
+            f"  Found {len(clusters)} clusters in response",
+            "\n✓ Each cluster contains full aggregated evidence:"
+        ]
         if primary:
             c = primary[0]
-            print(f"  - observation_ids: {len(c.get('observation_ids', []))}")
-            print(f"  - all_prompt_ids: {len(c['all_prompt_ids'])}")
-            print(f"  - all_timestamps: {len(c['all_timestamps'])}")
-            print(f"  - wording_variations: {len(c['wording_variations'])}")
-        
-        print("\n✓ Scoring is cluster-based (not canonical-based):")
+            prompt_count = len(c['all_prompt_ids'])
+            variation_count = len(c['wording_variations'])
+            lines += [
+                f"  - observation_ids: {len(c.get('observation_ids', []))}",
+                f"  - all_prompt_ids: {prompt_count}",
+                f"  - all_timestamps: {len(c['all_timestamps'])}",
+                f"  - wording_variations: {variation_count}"
+            ]
+        
+        lines.append("\n✓ Scoring is cluster-based (not canonical-based):")
         if primary:
-            c = primary[0]
-            print(f"  - cluster_strength = log(size+1) * mean_abw * recency")
-            print(f"  - confidence = consistency * reinforcement * clarity_trend")
-            print(f"  - canonical_label is just for display")
+            lines += [
+                f"  - cluster_strength = log(size+1) * mean_abw * recency",
+                f"  - confidence = consistency * reinforcement * clarity_trend",
+                f"  - canonical_label is just for display"
+            ]
         
-        print("\n✓ Can answer 'WHY is this core?' with evidence:")
+        lines.append("\n✓ Can answer 'WHY is this core?' with evidence:")
         if primary:
-            c = primary[0]
-            print(f"  - Appeared in {len(c['all_prompt_ids'])} prompts")
-            print(f"  - {len(c['wording_variations'])} different phrasings")
-            print(f"  - Active for {c['days_active']:.1f} days")
-            print(f"  - Internal consistency: {c['consistency_score']:.4f}")
+            lines += [
+                f"  - Appeared in {prompt_count} prompts",
+                f"  - {variation_count} different phrasings",
+                f"  - Active for {c['days_active']:.1f} days",
+                f"  - Internal consistency: {c['consistency_score']:.4f}"
+            ]
+        
+        print("\n".join(lines))
         
         print("\n" + "="*70)
         print("  ✅ CLUSTER-CENTRIC API TEST PASSED")
@@ -173,4 +205,5 @@ def test_cluster_centric_api():
 
 
 if __name__ == "__main__":
-    test_cluster_centric_api()
+    with SESSION:
+        test_cluster_centric_api()
@@ -2,95 +2,41 @@
 Test the NEW cluster-centric pipeline
 """
 import asyncio
-import json
-import time
-import sys
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+import pytest
+from typing import List
 
 from src.models.schemas import BehaviorObservation, PromptModel
 from src.services.cluster_analysis_pipeline import cluster_analysis_pipeline
+from _fixtures import find_cluster_dataset, load_cluster_observations, load_cluster_prompts
+from _timing import record, tic
+
+# Needs MongoDB/Qdrant/Azure OpenAI; deselect with -m "not integration"
+pytestmark = pytest.mark.integration
 
 
-async def test_cluster_pipeline():
+async def test_cluster_pipeline(
+    llm_services: tuple,
+    cluster_dataset: tuple,
+    cluster_observations: List[BehaviorObservation],
+    cluster_prompts: List[PromptModel]
+):
     """Test the cluster-centric analysis pipeline"""
     
     print("="*70)
     print("  TESTING CLUSTER-CENTRIC PIPELINE")
     print("="*70)
     
-    # Initialize services
-    print("\n0. Initializing services...")
-    from src.services.embedding_service import embedding_service
-    from src.services.archetype_service import archetype_service
-    
-    try:
-        embedding_service.connect()
-        archetype_service.connect()
-        print("   Services initialized ✓")
-    except Exception as e:
-        print(f"   Warning: Could not initialize services: {e}")
-        print("   Continuing without embedding/archetype generation...")
-    
-    # Load sample data (use one of the newly generated datasets)
+    # Embedding/archetype clients and sample data come from the
+    # session-scoped fixtures in conftest.py
     print("\n1. Loading sample data...")
-    
-    # Find the first available user dataset
-    from pathlib import Path
-    dataset_dir = Path('test-data/behavior_dataset')
-    behavior_files = sorted(dataset_dir.glob('behaviors_user_*.json'))
-    
-    if not behavior_files:
-        print("   ERROR: No behavior files found in test-data/behavior_dataset/")
-        return
-    
-    # Use the first available file
-    behavior_file = behavior_files[0]
-    user_id = behavior_file.stem.replace('behaviors_', '')
-    prompt_file = dataset_dir / f'prompts_{user_id}.json'
+    user_id = cluster_dataset[0]
     
     print(f"   Using dataset for: {user_id}")
     
-    with open(behavior_file, 'r') as f:
-        behaviors_data = json.load(f)
-    
-    with open(prompt_file, 'r') as f:
-        prompts_data = json.load(f)
-    
-    print(f"   Loaded {len(behaviors_data)} behaviors and {len(prompts_data)} prompts")
-    
-    # Convert to BehaviorObservation objects
+    # The fixtures decode each file straight into the models
     print("\n2. Converting to BehaviorObservation objects...")
-    observations = []
-    for b in behaviors_data:
-        obs = BehaviorObservation(
-            observation_id=b['behavior_id'],
-            behavior_text=b['behavior_text'],
-            credibility=b['credibility'],
-            clarity_score=b['clarity_score'],
-            extraction_confidence=b.get('confidence', 0.80),  # Map 'confidence' to 'extraction_confidence'
-            timestamp=b.get('created_at', b.get('last_seen', int(time.time()))),
-            prompt_id=b['prompt_history_ids'][0] if b['prompt_history_ids'] else 'unknown',
-            decay_rate=b.get('decay_rate', 0.01),
-            user_id=b.get('user_id', 'unknown'),
-            session_id=b.get('session_id', 'unknown')
-        )
-        observations.append(obs)
-    
-    # Convert to PromptModel objects
-    prompts = []
-    for p in prompts_data:
-        prompt = PromptModel(
-            prompt_id=p['prompt_id'],
-            prompt_text=p['prompt_text'],
-            timestamp=p['timestamp'],
-            tokens=p.get('tokens'),
-            user_id=p.get('user_id', 'user_348'),
-            session_id=p.get('session_id')
-        )
-        prompts.append(prompt)
+    observations = cluster_observations
+    prompts = cluster_prompts
     
     print(f"   Converted {len(observations)} observations and {len(prompts)} prompts")
     
@@ -98,7 +44,7 @@ async def test_cluster_pipeline():
     print("\n3. Running cluster-centric analysis...")
     print(f"   Note: With {len(observations)} observations, clustering may produce 0-2 clusters")
     print(f"   (min_cluster_size=2, so need at least 2 similar observations)")
-    start_time = time.time()
+    t0 = tic()
     
     profile = await cluster_analysis_pipeline.analyze_observations(
         user_id='user_348_test',
@@ -108,8 +54,9 @@ async def test_cluster_pipeline():
         store_in_dbs=False  # Don't store during test
     )
     
-    elapsed = time.time() - start_time
-    print(f"   Analysis completed in {elapsed:.2f} seconds")
+    elapsed_ns = tic() - t0
+    record("test_cluster_pipeline", elapsed_ns)
+    print(f"   Analysis completed in {elapsed_ns / 1e9:.2f} seconds")
     
     # Display results
     print("\n" + "="*70)
@@ -126,10 +73,15 @@ async def test_cluster_pipeline():
     print(f"   Total prompts: {profile.statistics.total_prompts_analyzed}")
     print(f"   Time span: {profile.statistics.analysis_time_span_days:.1f} days")
     
-    # Analyze clusters by tier
-    primary_clusters = [c for c in profile.behavior_clusters if c.tier.value == 'PRIMARY']
-    secondary_clusters = [c for c in profile.behavior_clusters if c.tier.value == 'SECONDARY']
-    noise_clusters = [c for c in profile.behavior_clusters if c.tier.value == 'NOISE']
+    # Analyze clusters by tier, bucketing them in a single pass
+    buckets = {'PRIMARY': [], 'SECONDARY': [], 'NOISE': []}
+    for c in profile.behavior_clusters:
+        tier = c.tier.value
+        if tier in buckets:
+            buckets[tier].append(c)
+    primary_clusters, secondary_clusters, noise_clusters = (
+        buckets['PRIMARY'], buckets['SECONDARY'], buckets['NOISE']
+    )
     
     print(f"\n🎯 Cluster Tiers:")
     print(f"   PRIMARY: {len(primary_clusters)} clusters")
@@ -208,5 +160,26 @@ async def test_cluster_pipeline():
 
 
 if __name__ == "__main__":
-    # Run the test
-    asyncio.run(test_cluster_pipeline())
+    # Run the test (from the repo root: PYTHONPATH=. python tests/test_cluster_pipeline.py)
+    dataset = find_cluster_dataset()
+    if dataset is None:
+        print("   ERROR: No behavior files found in test-data/behavior_dataset/")
+    else:
+        from src.services.embedding_service import embedding_service
+        from src.services.archetype_service import archetype_service
+        
+        print("\n0. Initializing services...")
+        try:
+            embedding_service.connect()
+            archetype_service.connect()
+            print("   Services initialized ✓")
+        except Exception as e:
+            print(f"   Warning: Could not initialize services: {e}")
+            print("   Continuing without embedding/archetype generation...")
+        
+        asyncio.run(test_cluster_pipeline(
+            (embedding_service, archetype_service),
+            dataset,
+            load_cluster_observations(dataset[1]),
+            load_cluster_prompts(dataset[2])
+        ))
@@ -1,13 +1,17 @@
 """Test LLM Context Generation"""
 import asyncio
 import sys
+import pytest
 from src.services.llm_context_service import generate_llm_context
 from src.database.mongodb_service import mongodb_service
 
+# Needs MongoDB/Qdrant/Azure OpenAI; deselect with -m "not integration"
+pytestmark = pytest.mark.integration
+
+
+@pytest.mark.usefixtures("mongodb")
 async def test_llm_context():
-    # Initialize MongoDB service
-    mongodb_service.connect()
-    
+    # MongoDB is connected once per session by the conftest.py fixture
     try:
         print("Testing LLM context generation for user_665390...\n")
         
@@ -40,8 +44,10 @@ async def test_llm_context():
         print(f"ERROR: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        mongodb_service.disconnect()
 
 if __name__ == "__main__":
-    asyncio.run(test_llm_context())
+    mongodb_service.connect()
+    try:
+        asyncio.run(test_llm_context())
+    finally:
+        mongodb_service.disconnect()
@@ -0,0 +1,77 @@
+"""
+Test MongoDBService bulk write paths against a mocked database
+"""
+import pytest
+from unittest.mock import MagicMock
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from src.database.mongodb_service import MongoDBService
+from src.models.schemas import PromptModel
+
+
+def _unacknowledged_insert_many(docs, ordered=True, bypass_document_validation=False, **kwargs):
+    """Mimic pymongo, which refuses bypass_document_validation with w=0"""
+    if bypass_document_validation:
+        raise OperationFailure("Cannot set bypass_document_validation with unacknowledged write concern")
+    return list(docs)
+
+
+@pytest.fixture
+def service() -> MongoDBService:
+    """MongoDBService whose db is a MagicMock"""
+    service = MongoDBService()
+    service.db = MagicMock()
+    service.db.get_collection.return_value.insert_many.side_effect = _unacknowledged_insert_many
+    return service
+
+
+def test_insert_prompts_bulk_fast(service):
+    """fast=True inserts unordered with w=0 and succeeds"""
+    prompts = [
+        PromptModel(prompt_id=f"prompt_{i}", prompt_text="text", timestamp=1761637013)
+        for i in range(3)
+    ]
+
+    assert service.insert_prompts_bulk(prompts, fast=True)
+
+    name, = service.db.get_collection.call_args.args
+    assert name == "prompts"
+    assert service.db.get_collection.call_args.kwargs["write_concern"].document == {"w": 0}
+
+    insert_many = service.db.get_collection.return_value.insert_many
+    docs, = insert_many.call_args.args
+    assert [doc["prompt_id"] for doc in docs] == ["prompt_0", "prompt_1", "prompt_2"]
+    assert insert_many.call_args.kwargs == {"ordered": False}
+
+
+def test_insert_behavior_documents_fast(service):
+    """Behavior documents go through the same unacknowledged path"""
+    docs = [{"observation_id": "obs_1", "user_id": "user_1"}]
+
+    assert service.insert_behavior_documents(docs, fast=True)
+    assert service.db.get_collection.call_args.args == ("behaviors",)
+    service.db.get_collection.return_value.insert_many.assert_called_once_with(docs, ordered=False)
+
+
+def test_update_behaviors_bulk_ops(service):
+    """One unordered bulk_write with an UpdateOne per observation_id"""
+    updates = {
+        "obs_1": {"reinforcement_count": 20},
+        "obs_2": {"credibility": 0.9, "last_seen": 1761637013},
+    }
+
+    assert service.update_behaviors_bulk(updates)
+
+    ops, = service.db.behaviors.bulk_write.call_args.args
+    assert ops == [
+        UpdateOne({"observation_id": "obs_1"}, {"$set": {"reinforcement_count": 20}}),
+        UpdateOne({"observation_id": "obs_2"}, {"$set": {"credibility": 0.9, "last_seen": 1761637013}}),
+    ]
+    assert service.db.behaviors.bulk_write.call_args.kwargs == {"ordered": False}
+
+
+def test_update_behaviors_bulk_empty(service):
+    """An empty update never reaches bulk_write, which rejects empty op lists"""
+    assert service.update_behaviors_bulk({})
+    service.db.behaviors.bulk_write.assert_not_called()
@@ -2,14 +2,11 @@
 Test script to analyze sample behaviors
 Tests the complete pipeline with the provided test data
 """
-import json
 import asyncio
-import time
 import sys
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+import time
+import pytest
+from typing import List
 
 from src.models.schemas import BehaviorModel, PromptModel
 from src.services.analysis_pipeline import analysis_pipeline
@@ -17,9 +14,18 @@ from src.database.mongodb_service import mongodb_service
 from src.database.qdrant_service import qdrant_service
 from src.services.embedding_service import embedding_service
 from src.services.archetype_service import archetype_service
+from _fixtures import load_sample_data, to_behavior_models, to_prompt_models
+from _timing import record, tic
 
+# Needs MongoDB/Qdrant/Azure OpenAI; deselect with -m "not integration"
+pytestmark = pytest.mark.integration
 
-async def test_with_sample_data():
+
+@pytest.mark.usefixtures("llm_services", "mongodb", "qdrant")
+async def test_with_sample_data(
+    sample_behavior_models: List[BehaviorModel],
+    sample_prompt_models: List[PromptModel]
+):
     """Test the complete pipeline with sample data"""
     
     print("="*60)
@@ -27,36 +33,13 @@ async def test_with_sample_data():
     print("="*60)
     print()
     
-    # Connect to services
-    print("Connecting to services...")
-    try:
-        mongodb_service.connect()
-        qdrant_service.connect()
-        embedding_service.connect()
-        archetype_service.connect()
-        print("✓ All services connected\n")
-    except Exception as e:
-        print(f"✗ Failed to connect to services: {e}")
-        return
+    # Services are connected once per session by the conftest.py fixtures
+    # Sample data is parsed and validated once per session by conftest.py
+    behaviors = sample_behavior_models
+    prompts = sample_prompt_models
     
-    # Load sample data
-    print("Loading sample data...")
-    try:
-        with open('test-data/behaviors_user_348_1765993674.json', 'r') as f:
-            behaviors_data = json.load(f)
-        
-        with open('test-data/prompts_user_348_1765993674.json', 'r') as f:
-            prompts_data = json.load(f)
-        
-        behaviors = [BehaviorModel(**b) for b in behaviors_data]
-        prompts = [PromptModel(**p) for p in prompts_data]
-        
-        print(f"✓ Loaded {len(behaviors)} behaviors")
-        print(f"✓ Loaded {len(prompts)} prompts\n")
-        
-    except Exception as e:
-        print(f"✗ Failed to load sample data: {e}")
-        return
+    print(f"✓ Loaded {len(behaviors)} behaviors")
+    print(f"✓ Loaded {len(prompts)} prompts\n")
     
     # Display sample behaviors
     print("Sample Behaviors:")
@@ -74,7 +57,7 @@ async def test_with_sample_data():
     print("Running analysis pipeline...")
     print("-" * 60)
     
-    start_time = time.time()
+    t0 = tic()
     
     try:
         profile = await analysis_pipeline.analyze_behaviors(
@@ -85,9 +68,10 @@ async def test_with_sample_data():
             current_timestamp=int(time.time())
         )
         
-        elapsed = time.time() - start_time
+        elapsed_ns = tic() - t0
+        record("test_with_sample_data", elapsed_ns)
         
-        print(f"✓ Analysis complete in {elapsed:.2f} seconds\n")
+        print(f"✓ Analysis complete in {elapsed_ns / 1e9:.2f} seconds\n")
         
         # Display results
         print("="*60)
@@ -136,14 +120,30 @@ async def test_with_sample_data():
         print(f"✗ Analysis failed: {e}")
         import traceback
         traceback.print_exc()
+
+
+if __name__ == "__main__":
+    # From the repo root: PYTHONPATH=. python tests/test_sample_data.py
+    behaviors_data, prompts_data = load_sample_data()
+    
+    print("Connecting to services...")
+    try:
+        mongodb_service.connect()
+        qdrant_service.connect()
+        embedding_service.connect()
+        archetype_service.connect()
+        print("✓ All services connected\n")
+    except Exception as e:
+        print(f"✗ Failed to connect to services: {e}")
+        sys.exit(1)
     
+    try:
+        asyncio.run(test_with_sample_data(
+            to_behavior_models(behaviors_data),
+            to_prompt_models(prompts_data)
+        ))
     finally:
-        # Cleanup
         print("\nDisconnecting from services...")
         mongodb_service.disconnect()
         qdrant_service.disconnect()
         print("✓ Disconnected\n")
-
-
-if __name__ == "__main__":
-    asyncio.run(test_with_sample_data())
@@ -0,0 +1,88 @@
+"""
+Test the /update-behaviors-bulk route against mocked services
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import routes
+
+
+def _stored(observation_id: str, **fields) -> dict:
+    """A behavior document shaped like BehaviorObservation.model_dump()"""
+    doc = {
+        "observation_id": observation_id,
+        "behavior_text": "prefers visual learning",
+        "credibility": 0.95,
+        "clarity_score": 0.76,
+        "extraction_confidence": 0.77,
+        "timestamp": 1765741962,
+        "prompt_id": "prompt_1",
+    }
+    doc.update(fields)
+    return doc
+
+
+@pytest.fixture
+def mongodb(monkeypatch) -> MagicMock:
+    """Mocked mongodb_service holding obs_1 and obs_2"""
+    mongodb = MagicMock()
+    stored = {"obs_1": _stored("obs_1"), "obs_2": _stored("obs_2")}
+    mongodb.get_behaviors_by_ids.side_effect = lambda ids: [stored[i] for i in ids if i in stored]
+    monkeypatch.setattr(routes, "mongodb_service", mongodb)
+    return mongodb
+
+
+@pytest.fixture
+def pipeline(monkeypatch) -> MagicMock:
+    """Mocked analysis_pipeline whose bulk update succeeds"""
+    pipeline = MagicMock()
+    pipeline.update_behaviors_metrics_bulk = AsyncMock(return_value=True)
+    monkeypatch.setattr(routes, "analysis_pipeline", pipeline)
+    return pipeline
+
+
+@pytest.fixture
+def client(mongodb, pipeline) -> TestClient:
+    """TestClient for an app with just the API router"""
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def test_later_updates_win(client, pipeline):
+    """Updates for the same behavior merge, with later entries winning"""
+    response = client.post("/api/v1/update-behaviors-bulk", json={"updates": [
+        {"behavior_id": "obs_1", "updates": {"reinforcement_count": 5, "credibility": 0.5}},
+        {"behavior_id": "obs_2", "updates": {"decay_rate": 0.02}},
+        {"behavior_id": "obs_1", "updates": {"reinforcement_count": 20}},
+    ]})
+
+    assert response.status_code == 200
+    assert [b["observation_id"] for b in response.json()] == ["obs_1", "obs_2"]
+    pipeline.update_behaviors_metrics_bulk.assert_awaited_once_with({
+        "obs_1": {"reinforcement_count": 20, "credibility": 0.5},
+        "obs_2": {"decay_rate": 0.02},
+    })
+
+
+def test_missing_behaviors_404(client, pipeline):
+    """Unknown ids are listed in a 404 and nothing is written"""
+    response = client.post("/api/v1/update-behaviors-bulk", json={"updates": [
+        {"behavior_id": "obs_1", "updates": {"reinforcement_count": 20}},
+        {"behavior_id": "obs_9", "updates": {"reinforcement_count": 20}},
+    ]})
+
+    assert response.status_code == 404
+    assert "obs_9" in response.json()["detail"]
+    pipeline.update_behaviors_metrics_bulk.assert_not_awaited()
+
+
+def test_empty_updates_422(client, mongodb, pipeline):
+    """An empty update list is rejected before any database call"""
+    response = client.post("/api/v1/update-behaviors-bulk", json={"updates": []})
+
+    assert response.status_code == 422
+    mongodb.get_behaviors_by_ids.assert_not_called()
+    pipeline.update_behaviors_metrics_bulk.assert_not_awaited()
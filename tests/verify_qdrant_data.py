@@ -1,8 +1,11 @@
 """
 Verification script to check that complete behavior data is saved in Qdrant
+Usage: python tests/verify_qdrant_data.py [user_id ...]  (defaults to user_332)
 """
-import json
+import asyncio
+import io
 import sys
+from functools import partial
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -12,94 +15,183 @@ sys.path.insert(0, str(parent_dir))
 import os
 os.chdir(parent_dir)
 
-from src.database.qdrant_service import QdrantService
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchValue, PayloadSelectorInclude
 
+from src.config import settings
+from _json_fast import dumps
 
-def main():
-    """Verify Qdrant contains complete behavior data"""
-    print("Connecting to Qdrant...")
-    qdrant_service = QdrantService()
-    qdrant_service.connect()
+# Summary line fields; the summary scrolls only ask Qdrant for these keys
+SUMMARY_FIELDS = ('behavior_text', 'credibility', 'reinforcement_count', 'clarity_score')
+_summary_payload = PayloadSelectorInclude(include=list(SUMMARY_FIELDS))
+_row_format = "{}. {}\n   └─ Credibility: {}, Reinforcement: {}, Clarity: {}".format
+
+# Payload keys every stored behavior should carry, in the order they are displayed
+DISPLAY_ORDER = (
+    'behavior_id', 'behavior_text', 'clarity_score', 'created_at',
+    'credibility', 'decay_rate', 'extraction_confidence', 'last_seen',
+    'prompt_history_ids', 'reinforcement_count', 'session_id', 'user_id'
+)
+EXPECTED_FIELDS = frozenset(DISPLAY_ORDER)
+
+# Points per summary scroll page
+PAGE_SIZE = 256
+
+# Users verified at the same time
+MAX_CONCURRENT_USERS = 2
+
+
+async def verify_user(client: AsyncQdrantClient, user_id: str, semaphore: asyncio.Semaphore) -> str:
+    """Verify one user's behaviors in Qdrant and return the report text"""
+    collection_name = settings.qdrant_collection
+    
+    # Each user's report is built in its own buffer so concurrent checks
+    # never interleave their output
+    out = io.StringIO()
+    emit = partial(print, file=out)
     
     try:
-        # Get all behaviors for user_332
-        user_id = "user_332"
-        print(f"\nFetching behaviors for {user_id}...")
-        
-        behaviors = qdrant_service.get_embeddings_by_user(user_id)
-        
-        print(f"\nFound {len(behaviors)} behaviors in Qdrant\n")
-        print("=" * 80)
-        
-        if behaviors:
-            # Display first behavior in detail
-            first_behavior = behaviors[0]
-            
-            print("\n📊 FIRST BEHAVIOR (Complete Data):\n")
-            print(f"ID: {first_behavior.get('id')}")
-            print(f"\n🔢 Vector (first 10 dimensions): {first_behavior.get('vector', [])[:10]}...")
-            print(f"Vector length: {len(first_behavior.get('vector', []))} dimensions")
-            
-            print("\n📦 PAYLOAD (All Metadata):")
-            payload = first_behavior.get('payload', {})
-            
-            for key, value in sorted(payload.items()):
-                if key == 'prompt_history_ids':
-                    print(f"  • {key}: {value[:3]}... ({len(value)} total)")
-                else:
-                    print(f"  • {key}: {value}")
-            
-            print("\n" + "=" * 80)
-            print("\n📋 ALL BEHAVIORS SUMMARY:\n")
+        async with semaphore:
+            emit(f"\nFetching behaviors for {user_id}...")
             
-            for i, behavior in enumerate(behaviors, 1):
-                payload = behavior.get('payload', {})
-                print(f"{i}. {payload.get('behavior_text')}")
-                print(f"   └─ Credibility: {payload.get('credibility')}, "
-                      f"Reinforcement: {payload.get('reinforcement_count')}, "
-                      f"Clarity: {payload.get('clarity_score')}")
+            user_filter = Filter(
+                must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]
+            )
             
-            # Verify all expected fields are present
-            print("\n" + "=" * 80)
-            print("\n✅ FIELD VERIFICATION:\n")
+            # Both scrolls share the filter and ordering, so the first point (full
+            # payload and vector) and the first summary page are fetched at
+            # once, alongside the server-side count
+            count_result, (first_points, _), (page, offset) = await asyncio.gather(
+                client.count(
+                    collection_name=collection_name,
+                    count_filter=user_filter,
+                    exact=True
+                ),
+                client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=user_filter,
+                    limit=1,
+                    with_payload=True,
+                    with_vectors=True
+                ),
+                client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=user_filter,
+                    limit=PAGE_SIZE,
+                    with_payload=_summary_payload,
+                    with_vectors=False
+                )
+            )
             
-            expected_fields = [
-                'behavior_id', 'behavior_text', 'user_id', 'session_id',
-                'credibility', 'reinforcement_count', 'decay_rate',
-                'created_at', 'last_seen', 'clarity_score',
-                'extraction_confidence', 'prompt_history_ids'
-            ]
+            total = count_result.count
+            emit(f"Found {total} behaviors in Qdrant\n")
             
-            first_payload = behaviors[0].get('payload', {})
-            missing_fields = [field for field in expected_fields if field not in first_payload]
-            
-            if missing_fields:
-                print(f"⚠️  Missing fields: {', '.join(missing_fields)}")
+            if total > 0 and first_points:
+                # Display first behavior in detail
+                first_behavior = first_points[0]
+                first_id = first_behavior.id
+                first_payload = first_behavior.payload or {}
+                first_vector = first_behavior.vector or []
+                vec_head = first_vector[:10]
+                
+                emit("=" * 80)
+                emit("\n📊 FIRST BEHAVIOR (Complete Data):\n")
+                emit(f"ID: {first_id}")
+                emit(f"\n🔢 Vector (first 10 dimensions): {vec_head}...")
+                emit(f"Vector length: {len(first_vector)} dimensions")
+                
+                emit("\n📦 PAYLOAD (All Metadata):")
+                
+                # Known fields in display order, then any extra keys
+                display_keys = [key for key in DISPLAY_ORDER if key in first_payload]
+                display_keys += sorted(first_payload.keys() - EXPECTED_FIELDS)
+                
+                for key in display_keys:
+                    value = first_payload[key]
+                    if key == 'prompt_history_ids':
+                        emit(f"  • {key}: {value[:3]}... ({len(value)} total)")
+                    else:
+                        emit(f"  • {key}: {value}")
+                
+                emit("\n" + "=" * 80)
+                emit("\n📋 ALL BEHAVIORS SUMMARY:\n")
+                
+                i = 0
+                while True:
+                    for behavior in page:
+                        i += 1
+                        payload = behavior.payload or {}
+                        emit(_row_format(i, *(payload.get(field) for field in SUMMARY_FIELDS)))
+                    
+                    if offset is None:
+                        break
+                    page, offset = await client.scroll(
+                        collection_name=collection_name,
+                        scroll_filter=user_filter,
+                        limit=PAGE_SIZE,
+                        offset=offset,
+                        with_payload=_summary_payload,
+                        with_vectors=False
+                    )
+                
+                # Verify all expected fields are present
+                emit("\n" + "=" * 80)
+                emit("\n✅ FIELD VERIFICATION:\n")
+                
+                missing_fields = sorted(EXPECTED_FIELDS.difference(first_payload))
+                
+                if missing_fields:
+                    emit(f"⚠️  Missing fields: {', '.join(missing_fields)}")
+                else:
+                    emit("✅ All expected fields are present!")
+                
+                # Show sample JSON structure
+                emit("\n" + "=" * 80)
+                emit("\n📄 SAMPLE JSON STRUCTURE:\n")
+                sample = {
+                    "id": first_id,
+                    "payload": first_payload,
+                    "vector": vec_head,
+                    "vector_truncated": len(first_vector) > len(vec_head)
+                }
+                emit(dumps(sample, indent=True))
+                
             else:
-                print("✅ All expected fields are present!")
-            
-            # Show sample JSON structure
-            print("\n" + "=" * 80)
-            print("\n📄 SAMPLE JSON STRUCTURE:\n")
-            sample = {
-                "id": first_behavior.get('id'),
-                "payload": first_payload,
-                "vector": first_behavior.get('vector', [])[:10] + ["..."]
-            }
-            print(json.dumps(sample, indent=2))
-            
-        else:
-            print("❌ No behaviors found in Qdrant!")
-        
+                emit("❌ No behaviors found in Qdrant!")
+    
     except Exception as e:
-        print(f"❌ Error: {e}")
+        print(f"❌ Error verifying {user_id}: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
     
+    return out.getvalue()
+
+
+async def main():
+    """Verify Qdrant contains complete behavior data for each user given on the command line"""
+    user_ids = sys.argv[1:] or ["user_332"]
+    
+    print("Connecting to Qdrant...")
+    client = AsyncQdrantClient(
+        url=settings.qdrant_url,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+        timeout=settings.qdrant_timeout
+    )
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_USERS)
+    
+    try:
+        # Users are checked concurrently; reports are written once, in argument order
+        reports = await asyncio.gather(
+            *(verify_user(client, user_id, semaphore) for user_id in user_ids)
+        )
+        sys.stdout.write("".join(reports))
+        sys.stdout.flush()
+    
     finally:
-        qdrant_service.disconnect()
+        await client.close()
         print("\n✅ Disconnected from Qdrant")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())